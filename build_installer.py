@@ -5,13 +5,40 @@ Compiles both setup.exe and uninstall.exe using PyInstaller
 
 import subprocess
 import shutil
+import tempfile
+import threading
 from pathlib import Path
 import os
 
 
+# Background deletions started by clean_build_artifacts (joined at the end of main)
+_cleanup_threads = []
+
+
+def _remove_dir_in_background(path):
+    """Rename the directory out of the way (instant), then delete it on a
+    thread so the build doesn't wait on a slow recursive delete"""
+    trash = path.with_name(f"{path.name}.trash-{os.getpid()}")
+    os.replace(path, trash)
+    _delete_in_background(trash)
+
+
+def _delete_in_background(path):
+    thread = threading.Thread(
+        target=shutil.rmtree, args=(path,), kwargs={"ignore_errors": True}
+    )
+    thread.start()
+    _cleanup_threads.append(thread)
+
+
 def clean_build_artifacts():
     """Remove old build artifacts"""
     print("[CLEAN] Removing old build artifacts...")
+    # Trash left behind by an earlier build that exited before its deletes finished
+    for leftover in Path.cwd().glob("*.trash-*"):
+        if leftover.is_dir():
+            _delete_in_background(leftover)
+            print(f"  [REMOVED] {leftover.name}/")
     artifacts = [
         "build",
         "dist/setup.exe",
@@ -23,7 +50,10 @@ def clean_build_artifacts():
         path = Path(item)
         if path.is_dir():
             try:
-                shutil.rmtree(path)
+                try:
+                    _remove_dir_in_background(path)
+                except OSError:
+                    shutil.rmtree(path)  # Rename refused (e.g. a file is open)
                 print(f"  [REMOVED] {item}/")
             except Exception as e:
                 print(f"  [Partial] Could not remove {item}: {e}")
@@ -36,8 +66,18 @@ def clean_build_artifacts():
     print("[OK] Clean complete\n")
 
 
-def build_uninstaller():
-    """Build uninstall.exe first"""
+def pyinstaller_env(name):
+    """Environment giving one PyInstaller build its own config/cache dir.
+    Builds that overlap must not share binCache, which is not safe for
+    concurrent use; keeping the dir per build name lets reruns reuse it."""
+    config_dir = Path.cwd() / "build-cache" / name
+    config_dir.mkdir(parents=True, exist_ok=True)
+    return {**os.environ, "PYINSTALLER_CONFIG_DIR": str(config_dir)}
+
+
+def start_uninstaller_build():
+    """Launch the uninstall.exe build without waiting for it.
+    Returns (process, stderr_file) for finish_uninstaller_build."""
     print("[BUILD] Building uninstaller...")
     cmd = [
         "pyinstaller",
@@ -48,11 +88,27 @@ def build_uninstaller():
         "dist/uninstaller.py",
     ]
 
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    if result.returncode != 0:
-        print("[ERROR] Uninstaller build failed:")
-        print(result.stderr)
-        return False
+    # stderr goes to a temp file rather than a pipe: nobody reads a pipe while
+    # other work overlaps the build, and a full pipe would stall pyinstaller
+    stderr_file = tempfile.TemporaryFile(mode="w+")
+    proc = subprocess.Popen(
+        cmd,
+        stdout=subprocess.DEVNULL,
+        stderr=stderr_file,
+        text=True,
+        env=pyinstaller_env("uninstall"),
+    )
+    return proc, stderr_file
+
+
+def finish_uninstaller_build(proc, stderr_file):
+    """Wait for the uninstaller build started by start_uninstaller_build"""
+    with stderr_file:
+        if proc.wait() != 0:
+            stderr_file.seek(0)
+            print("[ERROR] Uninstaller build failed:")
+            print(stderr_file.read())
+            return False
 
     # Move uninstall.exe to dist/
     uninstall_src = Path("dist/uninstall.exe")
@@ -66,14 +122,50 @@ def build_uninstaller():
     return True
 
 
+def _link_or_copy(src, dst):
+    """Hardlink src to dst (no bytes copied), or copy when linking isn't possible
+    (different volume, FAT filesystem)."""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def _stage_tree(src_dir, stage_dir, exclude_dirs, exclude_extensions, rel=""):
+    os.makedirs(stage_dir, exist_ok=True)
+    # scandir entries carry their type from the directory listing: no extra
+    # stat per entry (expensive on Windows) and no Path objects
+    with os.scandir(src_dir) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name in exclude_dirs:
+                    print(f"  - Skipped: app/{rel}{entry.name}/ (EXCLUDED)")
+                    continue
+                _stage_tree(
+                    entry.path,
+                    os.path.join(stage_dir, entry.name),
+                    exclude_dirs,
+                    exclude_extensions,
+                    f"{rel}{entry.name}/",
+                )
+            elif entry.is_file():
+                if os.path.splitext(entry.name)[1] in exclude_extensions:
+                    continue
+                _link_or_copy(entry.path, os.path.join(stage_dir, entry.name))
+
+
 def get_app_data_args(dist_dir):
-    """Dynamically generate --add-data args for the app directory"""
+    """Stage the app directory (minus exclusions) and return its --add-data arg.
+
+    One directory rule instead of one per file keeps the PyInstaller command
+    short (Windows caps a command line at 8191 characters); the stage is built
+    from hardlinks, so it costs no bulk copying."""
     app_dir = dist_dir / "app"
-    add_data = []
+    stage_dir = Path.cwd() / "build" / "app-stage"
 
-    print(f"[SCAN] Scanning {app_dir} for inclusions...")
+    print(f"[SCAN] Staging {app_dir} for inclusion...")
 
-    # Items to explicitly EXCLUDE
+    # Items to explicitly EXCLUDE (at any depth)
     exclude_dirs = {
         "models",
         "userdata",
@@ -84,31 +176,17 @@ def get_app_data_args(dist_dir):
     }
     exclude_extensions = {".pyc", ".tmp", ".log"}
 
-    # 1. Add app root files (server.py, state.py, etc.)
-    for file in app_dir.glob("*"):
-        if file.is_file():
-            if file.suffix in exclude_extensions:
-                continue
-            add_data.append(f"--add-data={file};app")
-            print(f"  + File: app/{file.name}")
+    if stage_dir.exists():
+        shutil.rmtree(stage_dir)
+    _stage_tree(app_dir, stage_dir, exclude_dirs, exclude_extensions)
+    print(f"  + Dir:  {stage_dir} -> app/")
 
-    # 2. Add subdirectories recursively, avoiding excluded ones
-    for item in app_dir.iterdir():
-        if item.is_dir():
-            if item.name in exclude_dirs:
-                print(f"  - Skipped: app/{item.name}/ (EXCLUDED)")
-                continue
+    return [f"--add-data={stage_dir};app"]
 
-            # For valid directories (ui, locales, logic, routers), include them
-            # We can just add the folder root: --add-data=path/to/folder;target/folder
-            add_data.append(f"--add-data={item};app/{item.name}")
-            print(f"  + Dir:  app/{item.name}/")
 
-    return add_data
-
-
-def build_installer():
-    """Build setup.exe with bundled app files"""
+def build_installer(app_data_args=None):
+    """Build setup.exe with bundled app files (app_data_args: a prior
+    get_app_data_args result, to skip rescanning)"""
     print("[BUILD] Building installer...")
 
     # Paths
@@ -125,7 +203,9 @@ def build_installer():
     ]
 
     # Dynamic app inclusions
-    add_data_args.extend(get_app_data_args(dist_dir))
+    if app_data_args is None:
+        app_data_args = get_app_data_args(dist_dir)
+    add_data_args.extend(app_data_args)
 
     # Build PyInstaller command
     cmd = (
@@ -152,10 +232,20 @@ def build_installer():
     )
 
     print(f"[CMD] Running PyInstaller with {len(add_data_args)} data rules...")
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    if result.returncode != 0:
-        print("[ERROR] Installer build failed:")
-        print(result.stderr)
+    # Stream the log as it is produced instead of buffering all of it until exit
+    proc = subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        bufsize=1,
+        env=pyinstaller_env("setup"),
+    )
+    with proc.stdout:
+        for line in proc.stdout:
+            print(line, end="")
+    if proc.wait() != 0:
+        print("[ERROR] Installer build failed (see log above)")
         return False
 
     print("[OK] Installer built successfully\n")
@@ -207,12 +297,25 @@ def main():
     print("=" * 60 + "\n")
 
     clean_build_artifacts()
+    try:
+        build_all()
+    finally:
+        for thread in _cleanup_threads:
+            thread.join()
+
+
+def build_all():
+    """Build both executables, verify, and print next steps"""
+    # uninstall.exe is only an input of the final installer step, so the app
+    # scan runs while it builds
+    uninstaller = start_uninstaller_build()
+    app_data_args = get_app_data_args(Path.cwd() / "dist")
 
-    if not build_uninstaller():
+    if not finish_uninstaller_build(*uninstaller):
         print("[FATAL] Uninstaller build failed, aborting.")
         return
 
-    if not build_installer():
+    if not build_installer(app_data_args):
         print("[FATAL] Installer build failed.")
         return
 
@@ -3,19 +3,19 @@ import os
 import sys
 
 
+# App root (parent of app/ directory), computed once: __file__ never changes.
+# This file is inside dist/app/config.py, so parent is dist/app/, parent.parent is dist/
+_APP_ROOT = Path(__file__).parent.absolute().parent
+
+
 # CRITICAL: Path Anchoring Functions
 def get_app_anchored_path(relative_path: str) -> Path:
     """
     Returns a guaranteed absolute path relative to THIS script file.
     Immune to where the user launched the terminal from.
     """
-    # Get the app root (parent of app/ directory)
-    # This file is inside dist/app/config.py, so parent is dist/app/, parent.parent is dist/
-    script_dir = Path(__file__).parent.absolute()
-    app_root = script_dir.parent
-
-    # Join and resolve to absolute path
-    return (app_root / relative_path).absolute()
+    # _APP_ROOT is already absolute, so the join is too
+    return _APP_ROOT / relative_path
 
 
 # Base directories
@@ -23,6 +23,7 @@ base_dir = Path(__file__).parent.absolute()
 userdata_dir = get_app_anchored_path("userdata")
 content_dir = userdata_dir / "content"
 cache_db_path = userdata_dir / "audio_cache.db"
+audio_cache_dir = userdata_dir / "audio"
 
 # File paths
 settings_file = userdata_dir / "settings.json"
@@ -1,68 +1,210 @@
 """
-SQLite-based Audio Cache with LRU eviction logic.
-Replaces file-based .cache/ directory with a database.
+Audio Cache with LRU eviction logic.
+WAV files live on disk under audio_dir/<key[:2]>/<key>.wav; SQLite holds only
+their metadata (size, timestamps), so large payloads never pass through the
+database's page cache or WAL.
 """
 
+import os
+import shutil
 import sqlite3
+import threading
 import time
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Dict, Iterable, Optional, Tuple
+
+# LRU access times are buffered in memory and written in one batch after this
+# many hits or this many seconds, whichever comes first
+ACCESS_FLUSH_HITS = 64
+ACCESS_FLUSH_INTERVAL = 30.0
+
+# put_many looks up replaced rows this many keys per query (SQLite's default
+# host parameter limit was 999 before 3.32)
+PUT_LOOKUP_BATCH = 500
+
+# Bytes of the database file SQLite may memory-map (reads skip the page cache copy)
+MMAP_SIZE = 256 * 1024 * 1024
+
+# Free pages left behind by an eviction that trigger an incremental vacuum
+# (~1 MB at the default 4 KB page size), and pages released per vacuum run
+VACUUM_FREE_PAGES = 256
+VACUUM_STEP_PAGES = 2048
+
+# DELETE ... RETURNING (SQLite 3.35+) reports evicted rows without a separate SELECT
+_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
 
 
 class AudioCache:
     """
-    SQLite-based audio cache with LRU (Least Recently Used) eviction.
-    Stores WAV audio data as BLOB with automatic size management.
+    File-backed audio cache with LRU (Least Recently Used) eviction.
+    Stores WAV audio as files, indexed by SQLite, with automatic size management.
     """
 
-    def __init__(self, db_path: Path, max_size_mb: float = 200.0):
+    def __init__(
+        self,
+        db_path: Path,
+        max_size_mb: float = 200.0,
+        audio_dir: Optional[Path] = None,
+    ):
         """
         Args:
             db_path: Path to SQLite database file
             max_size_mb: Maximum cache size in MB (default: 200MB)
+            audio_dir: Directory for the WAV files (default: "audio" next to the db)
         """
         self.db_path = db_path
+        self.audio_dir = audio_dir or db_path.parent / "audio"
         self.max_size_mb = max_size_mb
+        # One long-lived connection, shared by the worker threads that call in
+        # (statements on it are serialized by the lock)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+        # cache_key -> latest hit time, not yet written (only the newest matters)
+        self._pending_access: Dict[str, float] = {}
+        self._hit_count = 0
+        self._last_access_flush = time.monotonic()
+        # Running SUM(size_bytes), kept in step with every insert and delete
+        self._total_bytes = 0
         self._init_db()
 
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit: single statements need no commit() round-trip
+        conn = sqlite3.connect(
+            str(self.db_path), check_same_thread=False, isolation_level=None
+        )
+        # WAL + NORMAL: a commit appends to the log instead of fsyncing the db
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+        return conn
+
+    def _flush_access(self):
+        """Write buffered access times in one transaction."""
+        with self._lock:
+            self._hit_count = 0
+            self._last_access_flush = time.monotonic()
+            if not self._pending_access or self._conn is None:
+                return
+            updates = [(t, key) for key, t in self._pending_access.items()]
+            self._pending_access.clear()
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "UPDATE audio_cache SET accessed_at = ? WHERE cache_key = ?",
+                    updates,
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _audio_path(self, cache_key: str) -> Path:
+        # Two-character fan-out keeps directories small
+        return self.audio_dir / cache_key[:2] / f"{cache_key}.wav"
+
+    def _write_file(self, cache_key: str, audio_data: bytes):
+        """Write via a temp file + rename, so a concurrent get never sees a partial WAV."""
+        path = self._audio_path(cache_key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_bytes(audio_data)
+        os.replace(tmp_path, path)
+
+    def _unlink_files(self, cache_keys):
+        for cache_key in cache_keys:
+            try:
+                self._audio_path(cache_key).unlink(missing_ok=True)
+            except OSError as e:
+                print(f"[CACHE ERROR] Failed to delete {cache_key}: {e}")
+
+    def close(self):
+        """Write pending access times and close the shared connection
+        (reopened by the next _init_db)."""
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    self._flush_access()
+                except sqlite3.Error as e:
+                    print(f"[CACHE ERROR] Access time flush failed: {e}")
+                try:
+                    self._conn.close()
+                finally:
+                    self._conn = None
+
     def _init_db(self):
         """Create database schema if not exists."""
         try:
-            conn = sqlite3.connect(str(self.db_path))
-            cursor = conn.cursor()
+            with self._lock:
+                if self._conn is None:
+                    self._conn = self._connect()
+                self.audio_dir.mkdir(parents=True, exist_ok=True)
+                cursor = self._conn.cursor()
+
+                # Databases from before the file-backed layout hold the audio as
+                # BLOBs: it is only a cache, so drop it and start empty
+                columns = [
+                    row[1] for row in cursor.execute("PRAGMA table_info(audio_cache)")
+                ]
+                if "audio_data" in columns:
+                    print("[CACHE] Migrating to file-backed cache (old entries dropped)")
+                    cursor.execute("DROP TABLE audio_cache")
+
+                # Let evictions hand free pages back to the filesystem. The mode
+                # only applies to a fresh file, so existing databases are rebuilt
+                # once (cheap: the table holds metadata only)
+                if cursor.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                    cursor.execute("PRAGMA auto_vacuum=INCREMENTAL")
+                    cursor.execute("VACUUM")
 
-            cursor.execute(
+                cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS audio_cache (
+                        cache_key TEXT PRIMARY KEY,
+                        size_bytes INTEGER NOT NULL,
+                        created_at REAL NOT NULL,
+                        accessed_at REAL NOT NULL
+                    )
                 """
-                CREATE TABLE IF NOT EXISTS audio_cache (
-                    cache_key TEXT PRIMARY KEY,
-                    audio_data BLOB NOT NULL,
-                    size_bytes INTEGER NOT NULL,
-                    created_at REAL NOT NULL,
-                    accessed_at REAL NOT NULL
                 )
-            """
-            )
 
-            # Index for LRU cleanup (sort by accessed_at)
-            cursor.execute(
+                # Index for LRU cleanup (sort by accessed_at)
+                cursor.execute(
+                    """
+                    CREATE INDEX IF NOT EXISTS idx_accessed_at
+                    ON audio_cache(accessed_at)
                 """
-                CREATE INDEX IF NOT EXISTS idx_accessed_at 
-                ON audio_cache(accessed_at)
-            """
-            )
+                )
+
+                # The only full scan: later size checks use the running total
+                self._total_bytes = cursor.execute(
+                    "SELECT COALESCE(SUM(size_bytes), 0) FROM audio_cache"
+                ).fetchone()[0]
 
-            conn.commit()
-            conn.close()
+            # The scan above read the table; pull the key index in as well while
+            # the UI loads, so the first lookup doesn't wait on the disk
+            threading.Thread(target=self._warm_key_index, daemon=True).start()
         except Exception as e:
             print(f"[CACHE ERROR] DB Init failed: {e}")
 
+    def _warm_key_index(self):
+        try:
+            with self._lock:
+                if self._conn is not None:
+                    self._conn.execute(
+                        "SELECT COUNT(cache_key) FROM audio_cache"
+                        " INDEXED BY sqlite_autoindex_audio_cache_1"
+                    ).fetchone()
+        except sqlite3.Error:
+            pass  # Only a warm-up
+
     def _ensure_db_ready(self):
-        """Self-healing: Ensure table exists before any operation."""
+        """Self-healing: Ensure the connection and table exist before any operation."""
         try:
-            conn = sqlite3.connect(str(self.db_path))
-            cursor = conn.cursor()
-            cursor.execute("SELECT 1 FROM audio_cache LIMIT 1")
-            conn.close()
+            with self._lock:
+                if self._conn is None:
+                    raise sqlite3.OperationalError("connection closed")
+                self._conn.execute("SELECT 1 FROM audio_cache LIMIT 1")
         except sqlite3.OperationalError:
             print("[CACHE RECOVERY] Table missing, re-initializing database...")
             self._init_db()
@@ -70,38 +212,56 @@ class AudioCache:
     def get(self, cache_key: str) -> Optional[bytes]:
         """
         Retrieve audio data from cache.
-        Updates access time (LRU tracking).
+        Records the access time (LRU tracking); it is written in batches.
 
         Returns:
             bytes: WAV audio data, or None if not found
         """
         self._ensure_db_ready()
         try:
-            conn = sqlite3.connect(str(self.db_path))
-            cursor = conn.cursor()
-
-            # Get audio data
-            cursor.execute(
-                "SELECT audio_data FROM audio_cache WHERE cache_key = ?", (cache_key,)
-            )
-            row = cursor.fetchone()
+            with self._lock:
+                # A hit is a read only, with no write to the db
+                row = self._conn.execute(
+                    "SELECT 1 FROM audio_cache WHERE cache_key = ?",
+                    (cache_key,),
+                ).fetchone()
+                if not row:
+                    return None
 
-            if row:
-                # Update access time (LRU)
-                cursor.execute(
-                    "UPDATE audio_cache SET accessed_at = ? WHERE cache_key = ?",
-                    (time.time(), cache_key),
-                )
-                conn.commit()
-                conn.close()
-                return row[0]
-
-            conn.close()
-            return None
+                try:
+                    audio_data = self._audio_path(cache_key).read_bytes()
+                except FileNotFoundError:
+                    # File removed behind our back: forget the entry
+                    self._forget(cache_key)
+                    return None
+
+                # Buffer the access time (LRU)
+                self._pending_access[cache_key] = time.time()
+                self._hit_count += 1
+                if (
+                    self._hit_count >= ACCESS_FLUSH_HITS
+                    or time.monotonic() - self._last_access_flush
+                    >= ACCESS_FLUSH_INTERVAL
+                ):
+                    self._flush_access()
+                return audio_data
         except sqlite3.OperationalError:
             self._init_db()
             return None
 
+    def _forget(self, cache_key: str):
+        """Drop the metadata row of an entry whose file is gone."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size_bytes FROM audio_cache WHERE cache_key = ?", (cache_key,)
+            ).fetchone()
+            if row:
+                self._conn.execute(
+                    "DELETE FROM audio_cache WHERE cache_key = ?", (cache_key,)
+                )
+                self._total_bytes -= row[0]
+            self._pending_access.pop(cache_key, None)
+
     def put(self, cache_key: str, audio_data: bytes):
         """
         Store audio data in cache.
@@ -111,29 +271,68 @@ class AudioCache:
             cache_key: MD5 hash key
             audio_data: WAV file bytes
         """
+        self.put_many([(cache_key, audio_data)])
+
+    def put_many(self, items: Iterable[Tuple[str, bytes]]):
+        """
+        Store several entries; their metadata goes in one transaction.
+        Triggers LRU cleanup once, after the batch, if size limit exceeded.
+
+        Args:
+            items: (cache_key, audio_data) pairs; a repeated key keeps its last data
+        """
         self._ensure_db_ready()
-        size_bytes = len(audio_data)
         current_time = time.time()
+        entries = dict(items)
+        if not entries:
+            return
 
         try:
-            conn = sqlite3.connect(str(self.db_path))
-            cursor = conn.cursor()
+            with self._lock:
+                # Files first: a row must never point at a missing file
+                for key, data in entries.items():
+                    self._write_file(key, data)
 
-            # Insert or replace
-            cursor.execute(
-                """
-                INSERT OR REPLACE INTO audio_cache 
-                (cache_key, audio_data, size_bytes, created_at, accessed_at)
-                VALUES (?, ?, ?, ?, ?)
-            """,
-                (cache_key, audio_data, size_bytes, current_time, current_time),
-            )
-
-            conn.commit()
-            conn.close()
-
-            # Check if cleanup needed
-            self._cleanup_if_needed()
+                self._conn.execute("BEGIN")
+                try:
+                    # Sizes of the rows about to be replaced, for the running total
+                    # (keys queried in groups below SQLite's host parameter limit)
+                    keys = list(entries)
+                    replaced = 0
+                    for i in range(0, len(keys), PUT_LOOKUP_BATCH):
+                        group = keys[i : i + PUT_LOOKUP_BATCH]
+                        replaced += self._conn.execute(
+                            "SELECT COALESCE(SUM(size_bytes), 0) FROM audio_cache "
+                            f"WHERE cache_key IN ({','.join('?' * len(group))})",
+                            group,
+                        ).fetchone()[0]
+
+                    # Insert or replace
+                    self._conn.executemany(
+                        """
+                        INSERT OR REPLACE INTO audio_cache
+                        (cache_key, size_bytes, created_at, accessed_at)
+                        VALUES (?, ?, ?, ?)
+                    """,
+                        [
+                            (key, len(data), current_time, current_time)
+                            for key, data in entries.items()
+                        ],
+                    )
+                    self._conn.execute("COMMIT")
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    # Replaced files are lost either way; unindexed ones must go
+                    self._unlink_files(entries)
+                    raise
+                self._total_bytes += (
+                    sum(len(data) for data in entries.values()) - replaced
+                )
+
+                # Check if cleanup needed
+                self._cleanup_if_needed()
+        except OSError as e:
+            print(f"[CACHE ERROR] Failed to write audio file: {e}")
         except sqlite3.OperationalError:
             self._init_db()
 
@@ -151,99 +350,137 @@ class AudioCache:
             f"\n[CACHE CLEANUP] Size {total_size_mb:.2f}MB exceeds {self.max_size_mb}MB limit"
         )
 
-        conn = sqlite3.connect(str(self.db_path))
-        cursor = conn.cursor()
-
-        # Get all entries sorted by access time (oldest first)
-        cursor.execute(
+        with self._lock:
+            # Eviction must see the latest access times
+            self._flush_access()
+            target_size_bytes = int(self.max_size_mb * 1024 * 1024)
+
+            # Keep the most recently used entries that fit in the limit: a running
+            # total from newest to oldest marks everything past it for eviction.
+            # One statement, evaluated entirely inside SQLite.
+            evict_query = """
+                SELECT cache_key FROM (
+                    SELECT cache_key, SUM(size_bytes) OVER (
+                        ORDER BY accessed_at DESC, cache_key
+                        ROWS UNBOUNDED PRECEDING
+                    ) AS running
+                    FROM audio_cache
+                )
+                WHERE running > ?
             """
-            SELECT cache_key, size_bytes, accessed_at 
-            FROM audio_cache 
-            ORDER BY accessed_at ASC
-        """
-        )
-
-        entries = cursor.fetchall()
-        current_size_bytes = sum(e[1] for e in entries)
-        target_size_bytes = int(self.max_size_mb * 1024 * 1024)
-
-        # Delete oldest until under limit
-        deleted_count = 0
-        for cache_key, size_bytes, accessed_at in entries:
-            if current_size_bytes <= target_size_bytes:
-                break
-
-            cursor.execute("DELETE FROM audio_cache WHERE cache_key = ?", (cache_key,))
-            current_size_bytes -= size_bytes
-            deleted_count += 1
-
-        conn.commit()
-        conn.close()
-
-        final_size_mb = current_size_bytes / (1024 * 1024)
+            if _HAS_RETURNING:
+                evicted = self._conn.execute(
+                    f"DELETE FROM audio_cache WHERE cache_key IN ({evict_query})"
+                    " RETURNING cache_key, size_bytes",
+                    (target_size_bytes,),
+                ).fetchall()
+            else:
+                self._conn.execute("BEGIN")
+                try:
+                    evicted = self._conn.execute(
+                        "SELECT cache_key, size_bytes FROM audio_cache"
+                        f" WHERE cache_key IN ({evict_query})",
+                        (target_size_bytes,),
+                    ).fetchall()
+                    self._conn.executemany(
+                        "DELETE FROM audio_cache WHERE cache_key = ?",
+                        [(key,) for key, _ in evicted],
+                    )
+                    self._conn.execute("COMMIT")
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    raise
+            deleted_count = len(evicted)
+            self._total_bytes -= sum(size for _, size in evicted)
+
+            # Removed while still holding the lock, so a concurrent put of the
+            # same key can't have its fresh file deleted
+            self._unlink_files(key for key, _ in evicted)
+
+            free_pages = self._conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if free_pages >= VACUUM_FREE_PAGES:
+                threading.Thread(target=self._incremental_vacuum, daemon=True).start()
+
+        final_size_mb = self.get_size_mb()
         print(f"[CACHE CLEANUP] Deleted {deleted_count} entries")
         print(f"[CACHE CLEANUP] New size: {final_size_mb:.2f}MB\n")
 
-    def get_size_mb(self) -> float:
-        """Get total cache size in MB."""
-        self._ensure_db_ready()
+    def _incremental_vacuum(self):
+        """Release free pages left by an eviction (runs off the request path)."""
         try:
-            conn = sqlite3.connect(str(self.db_path))
-            cursor = conn.cursor()
-
-            cursor.execute("SELECT SUM(size_bytes) FROM audio_cache")
-            total_bytes = cursor.fetchone()[0] or 0
+            with self._lock:
+                if self._conn is not None:
+                    # executescript steps the pragma to completion; execute()
+                    # would release a single page
+                    self._conn.executescript(
+                        f"PRAGMA incremental_vacuum({VACUUM_STEP_PAGES});"
+                    )
+        except sqlite3.Error as e:
+            print(f"[CACHE ERROR] Incremental vacuum failed: {e}")
 
-            conn.close()
-            return total_bytes / (1024 * 1024)
-        except sqlite3.OperationalError:
-            self._init_db()
-            return 0.0
+    def get_size_mb(self) -> float:
+        """Get total cache size in MB (running total, no table scan)."""
+        return self._total_bytes / (1024 * 1024)
 
     def get_count(self) -> int:
         """Get total number of cached entries."""
         self._ensure_db_ready()
         try:
-            conn = sqlite3.connect(str(self.db_path))
-            cursor = conn.cursor()
-
-            cursor.execute("SELECT COUNT(*) FROM audio_cache")
-            count = cursor.fetchone()[0]
-
-            conn.close()
-            return count
+            with self._lock:
+                return self._conn.execute(
+                    "SELECT COUNT(*) FROM audio_cache"
+                ).fetchone()[0]
         except sqlite3.OperationalError:
             self._init_db()
             return 0
 
+    def get_stats(self) -> Tuple[int, float]:
+        """Get entry count and total size in MB with a single aggregate query."""
+        self._ensure_db_ready()
+        try:
+            with self._lock:
+                count, total_bytes = self._conn.execute(
+                    "SELECT COUNT(*), SUM(size_bytes) FROM audio_cache"
+                ).fetchone()
+            return count, (total_bytes or 0) / (1024 * 1024)
+        except sqlite3.OperationalError:
+            self._init_db()
+            return 0, 0.0
+
     def clear_all(self) -> Tuple[int, float]:
         """
-        Delete the database file and recreate schema.
+        Delete the database file and the audio files, and recreate schema.
 
         Returns:
             (files_deleted, freed_mb)
         """
         try:
-            count = self.get_count()
-            size_mb = self.get_size_mb()
-
-            # Delete the file
-            if self.db_path.exists():
-                try:
-                    self.db_path.unlink()
-                    print(f"[CACHE] Deleted database file: {self.db_path}")
-                except Exception as e:
-                    print(
-                        f"[CACHE] Failed to delete file, falling back to DELETE FROM: {e}"
-                    )
-                    conn = sqlite3.connect(str(self.db_path))
-                    cursor = conn.cursor()
-                    cursor.execute("DELETE FROM audio_cache")
-                    conn.commit()
-                    conn.close()
-
-            # Re-init
-            self._init_db()
+            with self._lock:
+                count, size_mb = self.get_stats()
+
+                # Everything is going away: drop buffered access times
+                self._pending_access.clear()
+                # The open connection would keep the file (and its WAL) locked
+                self.close()
+
+                # Delete the file
+                if self.db_path.exists():
+                    try:
+                        self.db_path.unlink()
+                        for suffix in ("-wal", "-shm"):
+                            Path(f"{self.db_path}{suffix}").unlink(missing_ok=True)
+                        print(f"[CACHE] Deleted database file: {self.db_path}")
+                    except Exception as e:
+                        print(
+                            f"[CACHE] Failed to delete file, falling back to DELETE FROM: {e}"
+                        )
+                        self._init_db()
+                        self._conn.execute("DELETE FROM audio_cache")
+
+                shutil.rmtree(self.audio_dir, ignore_errors=True)
+
+                # Re-init
+                self._init_db()
 
             return count, size_mb
         except Exception as e:
@@ -7,6 +7,8 @@ import sys
 import requests
 import zipfile
 import shutil
+import tempfile
+import time
 from pathlib import Path
 from typing import Callable, Optional
 
@@ -25,6 +27,20 @@ FFPROBE_EXE = BIN_DIR / "ffprobe.exe"
 # Stable FFMPEG build from Gyan.dev
 FFMPEG_DOWNLOAD_URL = "https://www.gyan.dev/ffmpeg/builds/ffmpeg-release-essentials.zip"
 
+# The archive is buffered in memory up to this size, and only spills to a temp file beyond it
+DOWNLOAD_SPOOL_MAX = 256 * 1024 * 1024
+
+# Download read size, and the minimum gap between progress updates while downloading
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+PROGRESS_INTERVAL = 0.05
+
+# Binary paths once found on disk. Only hits are remembered, so a later
+# install is picked up by the next lookup with nothing to invalidate
+_FFMPEG_PATH: Optional[str] = None
+_FFPROBE_PATH: Optional[str] = None
+# Set once both binaries have been seen; they don't disappear during a session
+_INSTALLED_CACHE = False
+
 class FFMPEGInstaller:
     """Handles automatic FFMPEG download and installation"""
     
@@ -38,7 +54,10 @@ class FFMPEGInstaller:
     
     def check_installed(self) -> bool:
         """Check if FFMPEG binaries are already installed"""
-        return FFMPEG_EXE.exists() and FFPROBE_EXE.exists()
+        global _INSTALLED_CACHE
+        if not _INSTALLED_CACHE:
+            _INSTALLED_CACHE = FFMPEG_EXE.exists() and FFPROBE_EXE.exists()
+        return _INSTALLED_CACHE
     
     def cancel(self):
         """Cancel the download process"""
@@ -58,53 +77,38 @@ class FFMPEGInstaller:
             # 2. Download FFMPEG zip
             self._update_progress(0, 0, "Connecting to download server...")
             
-            temp_zip = BIN_DIR / "ffmpeg_temp.zip"
-            
             response = requests.get(FFMPEG_DOWNLOAD_URL, stream=True, timeout=30)
             response.raise_for_status()
             
             total_size = int(response.headers.get('content-length', 0))
             downloaded = 0
             
-            with open(temp_zip, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
+            # Spooled buffer: the zip is written and read back once, from memory,
+            # instead of through bin/ffmpeg_temp.zip (which needed cleanup on every exit path)
+            with tempfile.SpooledTemporaryFile(max_size=DOWNLOAD_SPOOL_MAX) as archive:
+                last_progress = 0.0
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
                     if self.is_cancelled:
-                        temp_zip.unlink(missing_ok=True)
                         return False, "Download cancelled"
                     
                     if chunk:
-                        f.write(chunk)
+                        archive.write(chunk)
                         downloaded += len(chunk)
-                        self._update_progress(downloaded, total_size, "Downloading FFMPEG...")
-            
-            # 3. Extract binaries
-            self._update_progress(0, 1, "Extracting binaries...")
-            
-            with zipfile.ZipFile(temp_zip, 'r') as zip_ref:
-                # Find the ffmpeg.exe and ffprobe.exe inside the zip
-                # They are usually in a structure like: ffmpeg-X.X.X-essentials_build/bin/ffmpeg.exe
-                ffmpeg_found = False
-                ffprobe_found = False
+                        # The UI polls the status a few times a second; more updates are wasted work
+                        now = time.monotonic()
+                        if now - last_progress >= PROGRESS_INTERVAL:
+                            last_progress = now
+                            self._update_progress(downloaded, total_size, "Downloading FFMPEG...")
                 
-                for file_info in zip_ref.namelist():
-                    if file_info.endswith('bin/ffmpeg.exe'):
-                        # Extract directly to our bin folder
-                        with zip_ref.open(file_info) as source, open(FFMPEG_EXE, 'wb') as target:
-                            shutil.copyfileobj(source, target)
-                        ffmpeg_found = True
-                    elif file_info.endswith('bin/ffprobe.exe'):
-                        with zip_ref.open(file_info) as source, open(FFPROBE_EXE, 'wb') as target:
-                            shutil.copyfileobj(source, target)
-                        ffprobe_found = True
-                    
-                    if ffmpeg_found and ffprobe_found:
-                        break
-            
-            # 4. Cleanup
-            temp_zip.unlink(missing_ok=True)
+                self._update_progress(downloaded, total_size, "Downloading FFMPEG...")
+                
+                # 3. Extract binaries
+                self._update_progress(0, 1, "Extracting binaries...")
+                archive.seek(0)
+                self._extract_binaries(archive)
             
-            # 5. Verify installation
-            if not (FFMPEG_EXE.exists() and FFPROBE_EXE.exists()):
+            # 4. Verify installation
+            if not self.check_installed():
                 return False, "Failed to extract FFMPEG binaries"
             
             self._update_progress(1, 1, "Installation complete!")
@@ -113,11 +117,31 @@ class FFMPEGInstaller:
         except requests.exceptions.RequestException as e:
             return False, f"Download failed: {str(e)}"
         except zipfile.BadZipFile:
-            temp_zip.unlink(missing_ok=True)
             return False, "Downloaded file is corrupted"
         except Exception as e:
             return False, f"Installation error: {str(e)}"
     
+    def _extract_binaries(self, archive):
+        """Copy ffmpeg.exe and ffprobe.exe out of the archive into BIN_DIR."""
+        # They are usually in a structure like: ffmpeg-X.X.X-essentials_build/bin/ffmpeg.exe,
+        # so members are matched on their last two path components
+        wanted = {'bin/ffmpeg.exe': FFMPEG_EXE, 'bin/ffprobe.exe': FFPROBE_EXE}
+        
+        with zipfile.ZipFile(archive, 'r') as zip_ref:
+            for file_info in zip_ref.infolist():
+                target_path = wanted.pop('/'.join(file_info.filename.rsplit('/', 2)[-2:]), None)
+                if target_path is None:
+                    continue
+                
+                # Extract directly to our bin folder. Copied in 1 MiB blocks: the
+                # archive itself may already be held in memory
+                with zip_ref.open(file_info) as source, open(target_path, 'wb') as target:
+                    shutil.copyfileobj(source, target, length=DOWNLOAD_CHUNK_SIZE)
+                
+                # Both binaries out: skip the rest of the archive
+                if not wanted:
+                    break
+    
     def _update_progress(self, current: int, total: int, message: str):
         """Internal helper to call progress callback"""
         if self.progress_callback:
@@ -131,32 +155,17 @@ def get_ffmpeg_path() -> Optional[str]:
     Get the path to the local FFMPEG executable.
     Returns None if not installed.
     """
-    if FFMPEG_EXE.exists():
-        return str(FFMPEG_EXE)
-    return None
+    global _FFMPEG_PATH
+    if _FFMPEG_PATH is None and FFMPEG_EXE.exists():
+        _FFMPEG_PATH = str(FFMPEG_EXE)
+    return _FFMPEG_PATH
 
 def get_ffprobe_path() -> Optional[str]:
     """
     Get the path to the local FFPROBE executable.
     Returns None if not installed.
     """
-    if FFPROBE_EXE.exists():
-        return str(FFPROBE_EXE)
-    return None
-
-# Configure pydub to use local FFMPEG
-def configure_pydub():
-    """
-    Configure pydub to use locally installed FFMPEG binaries.
-    Must be called after FFMPEG is installed and before using pydub.
-    """
-    from pydub import AudioSegment
-    
-    ffmpeg_path = get_ffmpeg_path()
-    ffprobe_path = get_ffprobe_path()
-    
-    if ffmpeg_path:
-        AudioSegment.converter = ffmpeg_path
-    if ffprobe_path:
-        AudioSegment.ffprobe = ffprobe_path
-
+    global _FFPROBE_PATH
+    if _FFPROBE_PATH is None and FFPROBE_EXE.exists():
+        _FFPROBE_PATH = str(FFPROBE_EXE)
+    return _FFPROBE_PATH
@@ -1,9 +1,166 @@
+import hashlib
 import os
 import shutil
+import threading
+import time
 import requests
+from requests.adapters import HTTPAdapter
 from huggingface_hub import hf_hub_download
+from concurrent.futures import ThreadPoolExecutor
 from typing import Literal
 
+DOWNLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB: keeps per-chunk Python overhead negligible
+RANGE_PARTS = 8  # Parallel Range requests for large files (CDNs often cap each connection)
+RANGE_MIN_SIZE = 16 << 20  # Below this a single stream is as fast
+PROGRESS_INTERVAL = 0.5  # Seconds between progress lines
+HASH_BLOCK_SIZE = 64 * 1024
+
+def _sha256_file(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            h.update(block)
+    return h.hexdigest()
+
+def _write_checksum(path: str) -> None:
+    """Record the file's SHA-256 in a <path>.sha256 sidecar (sha256sum format), marking it complete."""
+    with open(path + ".sha256", 'w') as f:
+        f.write(f"{_sha256_file(path)}  {os.path.basename(path)}\n")
+
+def _is_verified(path: str) -> bool:
+    """
+    True if the file exists and matches its recorded SHA-256.
+    Files from installs before the sidecars existed are taken as complete and
+    get their sidecar back-filled. A mismatching file is left in place: the
+    fresh download replaces it only once complete (.tmp + os.replace).
+    """
+    if not os.path.exists(path):
+        return False
+    sidecar = path + ".sha256"
+    if not os.path.exists(sidecar):
+        _write_checksum(path)
+        return True
+    with open(sidecar) as f:
+        recorded = f.read().split()[:1]
+    if recorded and recorded[0] == _sha256_file(path):
+        return True
+    print(f"  {os.path.basename(path)} does not match its checksum, fetching again")
+    return False
+
+def _download_file(url: str, dest: str, timeout: int = 60, show_progress: bool = False) -> None:
+    """Download a URL to disk, in parallel byte ranges when the server supports them, optionally printing progress.
+    Data goes to <dest>.tmp, which replaces dest only once complete; a checksum sidecar is written after."""
+    tmp_dest = dest + ".tmp"
+    with requests.Session() as session:
+        # One keep-alive connection per range worker
+        adapter = HTTPAdapter(pool_connections=RANGE_PARTS, pool_maxsize=RANGE_PARTS)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+
+        # A one-byte Range probe: 206 means ranges work and carries the total size;
+        # a plain 200 is already the full body, streamed as before
+        r = session.get(url, headers={'Range': 'bytes=0-0'}, stream=True, timeout=timeout)
+        r.raise_for_status()
+        if r.status_code == 206:
+            # "bytes 0-0/<total>"; the total may be "*" (unknown) or the header missing:
+            # treat as 0, which falls back to a single whole-file stream below
+            total = r.headers.get('content-range', '').rpartition('/')[2].strip()
+            total_size = int(total) if total.isdigit() else 0
+        else:
+            total_size = int(r.headers.get('content-length', 0))
+        total_size_mb = total_size / (1024 * 1024) if total_size > 0 else 0
+
+        if show_progress:
+            print(f"  Total size: {total_size_mb:.1f} MB")
+
+        lock = threading.Lock()
+        downloaded = 0
+        last_print = 0.0
+
+        def advance(n: int):
+            nonlocal downloaded, last_print
+            with lock:
+                downloaded += n
+                # Progress indicator
+                if show_progress and total_size > 0:
+                    now = time.monotonic()
+                    if now - last_print >= PROGRESS_INTERVAL or downloaded == total_size:
+                        last_print = now
+                        progress = (downloaded / total_size) * 100
+                        downloaded_mb = downloaded / (1024 * 1024)
+                        print(f"  Progress: {progress:.1f}% ({downloaded_mb:.1f}/{total_size_mb:.1f} MB)", end='\r')
+
+        try:
+            if r.status_code != 206 or total_size < RANGE_MIN_SIZE:
+                if r.status_code == 206:
+                    # Small file (or unknown size): fetch it whole
+                    r.close()
+                    r = session.get(url, stream=True, timeout=timeout)
+                    r.raise_for_status()
+                    if not total_size:
+                        total_size = int(r.headers.get('content-length', 0))
+                        total_size_mb = total_size / (1024 * 1024)
+                with r, open(tmp_dest, 'wb') as f:
+                    for chunk in r.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                        if chunk:
+                            f.write(chunk)
+                            advance(len(chunk))
+            else:
+                r.close()
+
+                def fetch_range(start: int, end: int):
+                    with session.get(url, headers={'Range': f'bytes={start}-{end}'}, stream=True, timeout=timeout) as part:
+                        part.raise_for_status()
+                        if part.status_code != 206:
+                            raise IOError(f"Server ignored range request ({part.status_code})")
+                        # Each worker writes its own slice of the pre-sized file
+                        with open(tmp_dest, 'r+b') as f:
+                            f.seek(start)
+                            for chunk in part.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                                if chunk:
+                                    f.write(chunk)
+                                    advance(len(chunk))
+                            if f.tell() != end + 1:
+                                raise IOError(f"Incomplete range {start}-{end}")
+
+                with open(tmp_dest, 'wb') as f:
+                    f.truncate(total_size)
+
+                part_size = -(-total_size // RANGE_PARTS)
+                ranges = [(start, min(start + part_size, total_size) - 1) for start in range(0, total_size, part_size)]
+                with ThreadPoolExecutor(max_workers=RANGE_PARTS) as executor:
+                    for future in [executor.submit(fetch_range, start, end) for start, end in ranges]:
+                        future.result()
+        except BaseException:
+            if os.path.exists(tmp_dest):
+                os.remove(tmp_dest)
+            raise
+
+    os.replace(tmp_dest, dest)
+    _write_checksum(dest)
+
+def quantize_local_model(src: str, dest: str) -> bool:
+    """
+    Build the Int8 model from an existing FP32 model with ORT dynamic quantization.
+    Returns False (leaving no partial file) if quantization is unavailable or fails.
+    """
+    try:
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+    except ImportError:
+        return False
+
+    tmp_dest = dest + ".tmp"
+    try:
+        quantize_dynamic(src, tmp_dest, weight_type=QuantType.QInt8)
+        os.replace(tmp_dest, dest)
+        _write_checksum(dest)
+        return True
+    except Exception as e:
+        print(f"  Local quantization failed: {e}")
+        if os.path.exists(tmp_dest):
+            os.remove(tmp_dest)
+        return False
+
 def download_kokoro_model(model_type: Literal["gpu", "cpu"] = "gpu") -> None:
     """
     Download the specified TTS model (Standard or Quantized).
@@ -33,33 +190,23 @@ def download_kokoro_model(model_type: Literal["gpu", "cpu"] = "gpu") -> None:
         model_label = "Standard GPU Model (FP32)"
         model_size = "~309MB"
 
-    # Download Model
-    if not os.path.exists(model_dest):
+    # CPU model: quantize the FP32 model locally if it is already on disk
+    fp32_model = os.path.join(target_dir, "kokoro.onnx")
+    if model_type == "cpu" and not _is_verified(model_dest) and os.path.exists(fp32_model):
+        print(f"Quantizing existing FP32 model to Int8...")
+        if quantize_local_model(fp32_model, model_dest):
+            print(f"  [OK] {model_label} saved as kokoro.int8.onnx")
+
+    def fetch_model():
+        if _is_verified(model_dest):
+            print(f"{model_label} already exists.")
+            return
         print(f"Downloading {model_label} ({model_size})...")
         try:
             if model_type == "cpu":
                 # Direct download from GitHub releases
                 print(f"  Starting download from: {model_url}")
-                r = requests.get(model_url, stream=True, timeout=600)  # 10 min timeout for large file
-                r.raise_for_status()
-                
-                total_size = int(r.headers.get('content-length', 0))
-                total_size_mb = total_size / (1024 * 1024) if total_size > 0 else 0
-                downloaded = 0
-                
-                print(f"  Total size: {total_size_mb:.1f} MB")
-                
-                with open(model_dest, 'wb') as f:
-                    for chunk in r.iter_content(chunk_size=8192):
-                        if chunk:
-                            f.write(chunk)
-                            downloaded += len(chunk)
-                            # Progress indicator
-                            if total_size > 0:
-                                progress = (downloaded / total_size) * 100
-                                downloaded_mb = downloaded / (1024 * 1024)
-                                print(f"  Progress: {progress:.1f}% ({downloaded_mb:.1f}/{total_size_mb:.1f} MB)", end='\r')
-                
+                _download_file(model_url, model_dest, timeout=600, show_progress=True)  # 10 min timeout for large file
                 print(f"\n  [OK] {model_label} saved as kokoro.int8.onnx")
             else:
                 # HuggingFace download for GPU model
@@ -68,33 +215,31 @@ def download_kokoro_model(model_type: Literal["gpu", "cpu"] = "gpu") -> None:
                 # hf_hub_download with local_dir might put it in target_dir/onnx/model.onnx
                 downloaded_file = os.path.join(target_dir, "onnx", "model.onnx")
                 if os.path.exists(downloaded_file):
-                    shutil.move(downloaded_file, model_dest)
+                    # Replaces a mismatching model only now that the new one is complete
+                    os.replace(downloaded_file, model_dest)
+                    _write_checksum(model_dest)
                     print(f"{model_label} saved as kokoro.onnx")
                 elif os.path.exists(path) and path != model_dest:
-                    shutil.copy2(path, model_dest)
+                    shutil.copy2(path, model_dest + ".tmp")
+                    os.replace(model_dest + ".tmp", model_dest)
+                    _write_checksum(model_dest)
                     print(f"{model_label} saved as kokoro.onnx")
         except Exception as e:
             print(f"Model download failed: {e}")
             raise
-    else:
-        print(f"{model_label} already exists.")
 
     # Download Voices (Shared resource - only download if missing)
     # MULTILINGUAL MODEL: voices-v1.0.bin (~30MB with FR/ES/JP support)
     voices_url = "https://github.com/thewh1teagle/kokoro-onnx/releases/download/model-files-v1.0/voices-v1.0.bin"
     voices_dest = os.path.join(target_dir, "voices.bin")
-    
-    if not os.path.exists(voices_dest):
+
+    def fetch_voices():
+        if _is_verified(voices_dest):
+            print("Voice Pack already exists (shared between both engines).")
+            return
         print(f"\nDownloading Voice Pack (shared resource)...")
         try:
-            r = requests.get(voices_url, stream=True, timeout=60)
-            r.raise_for_status()
-            
-            with open(voices_dest, 'wb') as f:
-                for chunk in r.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-            
+            _download_file(voices_url, voices_dest, timeout=60)
             print("Voice Pack saved as voices.bin")
             
             # Remove old voices.json to avoid confusion
@@ -104,8 +249,12 @@ def download_kokoro_model(model_type: Literal["gpu", "cpu"] = "gpu") -> None:
         except Exception as e:
             print(f"Voice Pack download failed: {e}")
             raise
-    else:
-        print("Voice Pack already exists (shared between both engines).")
+
+    # Model and voice pack are independent: fetch both at once
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [executor.submit(fetch_model), executor.submit(fetch_voices)]
+        for future in futures:
+            future.result()
 
     # Final Cleanup
     onnx_folder = os.path.join(target_dir, "onnx")
@@ -0,0 +1,88 @@
+"""
+EPUB -> PDF conversion.
+Kept free of server imports so it can run in worker processes: parsing and
+PDF rendering are pure-Python and CPU-bound, and would otherwise hold the GIL
+for seconds while the server is answering TTS requests.
+"""
+
+import functools
+from pathlib import Path
+
+
+class EpubReadError(Exception):
+    """The EPUB could not be opened (corrupt or DRM-protected)."""
+
+
+class PdfRenderError(Exception):
+    """The HTML -> PDF step reported errors."""
+
+
+@functools.lru_cache(maxsize=None)
+def _get_epub_deps():
+    """
+    Import the EPUB/PDF stack on first use only. xhtml2pdf pulls in reportlab,
+    which costs noticeable startup time and memory for users who never convert.
+    """
+    import ebooklib
+    from ebooklib import epub
+    from bs4 import BeautifulSoup
+    from xhtml2pdf import pisa
+
+    return ebooklib, epub, BeautifulSoup, pisa
+
+
+@functools.lru_cache(maxsize=None)
+def _get_weasyprint():
+    """
+    Optional faster renderer (pip install weasyprint). Its C libraries
+    (Pango/cairo) may be missing even when the package is installed, which
+    surfaces as OSError at import rather than ImportError.
+    """
+    try:
+        from weasyprint import HTML
+    except (ImportError, OSError):
+        return None
+    return HTML
+
+
+def _render_pdf(html_path: Path, pdf_path: Path):
+    HTML = _get_weasyprint()
+    if HTML is not None:
+        try:
+            HTML(filename=str(html_path), encoding="utf-8").write_pdf(str(pdf_path))
+            return
+        except Exception as e:
+            print(f"[EPUB] WeasyPrint failed, falling back to xhtml2pdf: {e}")
+
+    pisa = _get_epub_deps()[3]
+    with open(html_path, "rb") as src, open(pdf_path, "wb") as f:
+        pisa_status = pisa.CreatePDF(src, dest=f, encoding="utf-8")
+    if pisa_status.err:
+        raise PdfRenderError("PDF conversion failed")
+
+
+def convert_epub_to_pdf(epub_path: Path, pdf_path: Path):
+    """EPUB -> PDF conversion (blocking). Raises EpubReadError / PdfRenderError."""
+    ebooklib, epub, BeautifulSoup, _ = _get_epub_deps()
+
+    try:
+        book = epub.read_epub(str(epub_path))
+    except Exception:
+        raise EpubReadError("Cannot read protected file (DRM)")
+
+    # Stream chapters to a temp HTML file as they are parsed: the whole book
+    # never exists as one string, and the renderer reads the file itself
+    html_path = pdf_path.with_suffix(".html")
+    try:
+        with open(html_path, "w", encoding="utf-8") as html:
+            html.write("<html><body>")
+            for item in book.get_items_of_type(ebooklib.ITEM_DOCUMENT):
+                soup = BeautifulSoup(item.get_content(), "lxml")
+                body = soup.find("body")
+                html.write(str(body) if body else str(soup))
+            html.write("</body></html>")
+
+        _render_pdf(html_path, pdf_path)
+    finally:
+        if html_path.exists():
+            html_path.unlink()
@@ -7,6 +7,17 @@ import re
 from typing import List, Tuple, Dict
 from difflib import SequenceMatcher
 
+_DIM_BLOCK_RE = re.compile(r'\[DIM\].*?\[/DIM\]', re.DOTALL)
+_ROMAN_NUMERAL_RE = re.compile(r'[ivxlcdm]+', re.IGNORECASE)
+_PAGE_OF_RE = re.compile(r'\d+\s*of\s*\d+', re.IGNORECASE)
+_WORD_RE = re.compile(r'\w+')
+# Every byte except ASCII letters and digits, for bytes.translate deletion
+_NON_ALNUM_BYTES = bytes(b for b in range(256) if not (48 <= b <= 57 or 65 <= b <= 90 or 97 <= b <= 122))
+# Lines this similar (0.0 to 1.0) to a neighbouring page's line count as repeated
+SIMILARITY_THRESHOLD = 0.9
+# First characters either pattern can start with (incl. the dotted/dotless i case folds)
+_PAGE_NUMBER_LEADS = frozenset('ivxlcdmIVXLCDM\u0130\u0131')
+
 def find_content_start_page(pages: List[str], max_scan: int = 10) -> int:
     """
     Scans the first N pages and finds the first page with substantial content.
@@ -23,15 +34,17 @@ def find_content_start_page(pages: List[str], max_scan: int = 10) -> int:
     for i in range(scan_limit):
         page_text = pages[i].strip()
         
-        # Count alphanumeric characters (ignore whitespace and punctuation)
-        char_count = len(re.findall(r'[a-zA-Z0-9]', page_text))
-        
-        # Count words
-        words = re.findall(r'\b\w+\b', page_text)
-        word_count = len(words)
+        # Count alphanumeric characters (ignore whitespace and punctuation):
+        # non-ASCII is dropped by the encode, the rest by one translate pass
+        char_count = len(page_text.encode('ascii', 'ignore').translate(None, _NON_ALNUM_BYTES))
         
         # Heuristic: Substantial content = >500 chars OR >100 words
-        if char_count > 500 or word_count > 100:
+        if char_count > 500:
+            return i
+        
+        # Count words (without building a list of them)
+        word_count = sum(1 for _ in _WORD_RE.finditer(page_text))
+        if word_count > 100:
             return i
     
     # If no substantial content found, start at page 0
@@ -40,7 +53,7 @@ def find_content_start_page(pages: List[str], max_scan: int = 10) -> int:
 
 def split_into_lines(text: str) -> List[str]:
     """Split text into lines and clean up."""
-    return [line.strip() for line in text.split('\n') if line.strip()]
+    return [line for line in map(str.strip, text.split('\n')) if line]
 
 
 def similarity(a: str, b: str) -> float:
@@ -48,17 +61,40 @@ def similarity(a: str, b: str) -> float:
     return SequenceMatcher(None, a.lower(), b.lower()).ratio()
 
 
+def _is_similar_lower(a: str, b: str, threshold: float = SIMILARITY_THRESHOLD) -> bool:
+    """is_similar for strings that are already lowercased."""
+    if a == b:
+        return True
+    # Upper bound of the ratio from the lengths alone: most candidate pairs are
+    # plainly different and never reach the matcher
+    if 2.0 * min(len(a), len(b)) / (len(a) + len(b)) <= threshold:
+        return False
+    matcher = SequenceMatcher(None, a, b)
+    return matcher.quick_ratio() > threshold and matcher.ratio() > threshold
+
+
+def is_similar(a: str, b: str, threshold: float = SIMILARITY_THRESHOLD) -> bool:
+    """similarity(a, b) > threshold, skipping the full comparison where the answer is already clear."""
+    return _is_similar_lower(a.lower(), b.lower(), threshold)
+
+
 def is_page_number(line: str) -> bool:
     """Detect if a line is likely a page number."""
     # Remove whitespace and common page number patterns
     cleaned = line.strip().replace('Page', '').replace('page', '').strip()
     
     # Check if it's just a number (or Roman numeral)
-    if re.match(r'^[0-9]+$', cleaned):
+    if cleaned.isascii() and cleaned.isdigit():
         return True
-    if re.match(r'^[ivxlcdm]+$', cleaned, re.IGNORECASE):
+
+    # Ordinary text lines start with a letter that can't begin either pattern
+    first = cleaned[:1]
+    if not first or not (first.isdecimal() or first in _PAGE_NUMBER_LEADS):
+        return False
+
+    if _ROMAN_NUMERAL_RE.fullmatch(cleaned):
         return True
-    if re.match(r'^\d+\s*of\s*\d+$', cleaned, re.IGNORECASE):
+    if _PAGE_OF_RE.fullmatch(cleaned):
         return True
     
     return False
@@ -104,12 +140,12 @@ def detect_headers_footers(pages: List[str], page_index: int) -> Dict[str, List[
         
         # Compare with previous page
         if prev_lines and i < len(prev_lines):
-            if similarity(current_line, prev_lines[i]) > 0.9:
+            if is_similar(current_line, prev_lines[i]):
                 matches += 1
         
         # Compare with next page
         if next_lines and i < len(next_lines):
-            if similarity(current_line, next_lines[i]) > 0.9:
+            if is_similar(current_line, next_lines[i]):
                 matches += 1
         
         # If line matches in at least 1 adjacent page
@@ -129,14 +165,14 @@ def detect_headers_footers(pages: List[str], page_index: int) -> Dict[str, List[
         if prev_lines:
             prev_index = len(prev_lines) - offset_from_end - 1
             if 0 <= prev_index < len(prev_lines):
-                if similarity(current_line, prev_lines[prev_index]) > 0.9:
+                if is_similar(current_line, prev_lines[prev_index]):
                     matches += 1
         
         # Compare with next page
         if next_lines:
             next_index = len(next_lines) - offset_from_end - 1
             if 0 <= next_index < len(next_lines):
-                if similarity(current_line, next_lines[next_index]) > 0.9:
+                if is_similar(current_line, next_lines[next_index]):
                     matches += 1
         
         # Also check if it's a page number
@@ -163,60 +199,23 @@ def apply_header_footer_filter(text: str, headers: List[str], footers: List[str]
         Filtered text (with markers if mode='dim')
     """
     lines = split_into_lines(text)
+    # Detected headers/footers are usually exact repeats: a set lookup settles
+    # those, and only the remaining lines are compared fuzzily
+    noise_lines = {line.lower() for line in headers + footers}
+    
+    def is_noise(line: str) -> bool:
+        line_lower = line.lower()
+        if line_lower in noise_lines or is_page_number(line):
+            return True
+        return any(_is_similar_lower(line_lower, noise) for noise in noise_lines)
     
     if mode == 'clean':
-        # Remove all matching lines
-        filtered_lines = []
-        for line in lines:
-            is_noise = False
-            
-            # Check if line matches any header/footer
-            for header in headers:
-                if similarity(line, header) > 0.9:
-                    is_noise = True
-                    break
-            
-            if not is_noise:
-                for footer in footers:
-                    if similarity(line, footer) > 0.9:
-                        is_noise = True
-                        break
-            
-            # Also check page numbers
-            if is_page_number(line):
-                is_noise = True
-            
-            if not is_noise:
-                filtered_lines.append(line)
-        
-        return '\n'.join(filtered_lines)
+        # Remove all matching lines (headers/footers and page numbers)
+        return '\n'.join(line for line in lines if not is_noise(line))
     
     elif mode == 'dim':
         # Mark lines with a special marker for frontend styling
-        marked_lines = []
-        for line in lines:
-            is_noise = False
-            
-            for header in headers:
-                if similarity(line, header) > 0.9:
-                    is_noise = True
-                    break
-            
-            if not is_noise:
-                for footer in footers:
-                    if similarity(line, footer) > 0.9:
-                        is_noise = True
-                        break
-            
-            if is_page_number(line):
-                is_noise = True
-            
-            if is_noise:
-                marked_lines.append(f'[DIM]{line}[/DIM]')
-            else:
-                marked_lines.append(line)
-        
-        return '\n'.join(marked_lines)
+        return '\n'.join(f'[DIM]{line}[/DIM]' if is_noise(line) else line for line in lines)
     
     else:
         return text
@@ -232,6 +231,10 @@ def filter_text_for_tts(text: str) -> str:
     Returns:
         Clean text without dimmed sections
     """
+    # Most text carries no markers; skip the regex engine entirely
+    if '[DIM]' not in text:
+        return text.strip()
+
     # Remove dimmed sections
-    return re.sub(r'\[DIM\].*?\[/DIM\]', '', text, flags=re.DOTALL).strip()
+    return _DIM_BLOCK_RE.sub('', text).strip()
 
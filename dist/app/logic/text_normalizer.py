@@ -1,51 +1,149 @@
 import re
-from typing import List, Dict, Any
+import functools
+from typing import List, Dict, Any, Tuple
+
+try:
+    import re2  # Optional linear-time engine (pip install google-re2)
+except ImportError:
+    re2 = None
+
+# Ligatures and typographic characters, replaced in one str.translate pass
+_LIGATURES = str.maketrans({'\ufb00': 'ff', '\ufb01': 'fi', '\ufb02': 'fl', '\ufb03': 'ffi', '\ufb04': 'ffl', '\ufb05': 'ft', '\ufb06': 'st', '\u00a0': ' ', '\u2013': '-', '\u2014': '--'})
+_DEHYPHEN_RE = re.compile(r'(\w+)-\s+(\w+)')
+# Ghost spaces in common words. The fixes apply one after another (an earlier fix
+# can consume letters a later one would match), so they stay separate; the merged
+# alternation only gates them, and most text needs a single scan
+_COMMON_GHOSTS = [(re.compile(pat, re.IGNORECASE), rep) for pat, rep in [(r'\bo\s+ff\b', 'off'), (r'\bo\s+f\b', 'of'), (r'\ba\s+nd\b', 'and'), (r'\bt\s+he\b', 'the'), (r'\bi\s+n\b', 'in'), (r'\bi\s+t\b', 'it'), (r'\bi\s+s\b', 'is'), (r'\bt\s+o\b', 'to'), (r'\bs\s+t\b', 'st')]]
+_COMMON_GHOST_RE = re.compile('|'.join(pat.pattern for pat, _ in _COMMON_GHOSTS), re.IGNORECASE)
+# A whole run of space-separated single letters ("W o r d"), matched in one scan
+_SINGLE_LETTERS_RE = re.compile(r'(?:^|(?<=\s))(?:[a-zA-Z]\s+)+[a-zA-Z](?=\s|$)')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Whitespace after an opening bracket/quote or before a closing one
+_PUNCT_SPACE_RE = re.compile(r'(?<=[\"\'\(\[\{\u201c\u2018\u201d\u2019])\s+|\s+(?=[\"\'\)\\\}\]\u201c\u2018\u201d\u2019])')
 
 def fix_broken_words(text: str) -> str:
     """Fixes PDF artifacts like ligatures, ghost spaces, and mid-word hyphens."""
     # 0. Ligatures
-    ligatures = {'\ufb00': 'ff', '\ufb01': 'fi', '\ufb02': 'fl', '\ufb03': 'ffi', '\ufb04': 'ffl', '\ufb05': 'ft', '\ufb06': 'st', '\u00a0': ' ', '\u2013': '-', '\u2014': '--'}
-    for char, rep in ligatures.items(): text = text.replace(char, rep)
+    text = text.translate(_LIGATURES)
 
     # 1. De-hyphenation
-    text = re.sub(r'(\w+)-\s+(\w+)', r'\1\2', text)
+    text = _DEHYPHEN_RE.sub(r'\1\2', text)
     
     # 2. Ghost spaces in common words
-    common = [(r'\bo\s+ff\b', 'off'), (r'\bo\s+f\b', 'of'), (r'\ba\s+nd\b', 'and'), (r'\bt\s+he\b', 'the'), (r'\bi\s+n\b', 'in'), (r'\bi\s+t\b', 'it'), (r'\bi\s+s\b', 'is'), (r'\bt\s+o\b', 'to'), (r'\bs\s+t\b', 'st')]
-    for pat, rep in common: text = re.sub(pat, rep, text, flags=re.IGNORECASE)
-
-    # 3. Recursive single letter join (e.g. "W o r d" -> "Word")
-    old = ""
-    while old != text:
-        old = text
-        text = re.sub(r'(?:^|(?<=\s))([a-zA-Z])\s+([a-zA-Z])(?=\s|$)', r'\1\2', text)
+    if _COMMON_GHOST_RE.search(text):
+        for pat, rep in _COMMON_GHOSTS: text = pat.sub(rep, text)
+
+    # 3. Single letter join (e.g. "W o r d" -> "Word")
+    text = _SINGLE_LETTERS_RE.sub(lambda m: ''.join(m.group().split()), text)
     
-    # 4. Cleanup punctuation spaces
-    text = re.sub(r'([\"\'\(\[\{\u201c\u2018\u201d\u2019])\s+', r'\1', text)
-    text = re.sub(r'\s+([\"\'\)\\\}\]\u201c\u2018\u201d\u2019])', r'\1', text)
-    text = re.sub(r'(?<=[\"\'\u201c\u2018\u201d\u2019])\s+', '', text)
-    text = re.sub(r'\s+(?=[\"\'\u201c\u2018\u201d\u2019])', '', text)
+    # 4. Cleanup punctuation spaces (single pass: after openers / before closers)
+    text = _PUNCT_SPACE_RE.sub('', text)
     
-    return re.sub(r'\s+', ' ', text).strip()
+    return _WHITESPACE_RE.sub(' ', text).strip()
+
+# Inline global flags ("(?i)") are only valid at the very start of a pattern
+_GLOBAL_FLAGS_RE = re.compile(r'^(?:\(\?[aiLmsux]+\))+')
+
+def _embeddable(name: str, orig: str, rep: str) -> bool:
+    """Whether a regex rule can join the shared alternation: checked in its embedded form
+    (a named group after another alternative), with no groups or global flags of its own
+    and a plain-text replacement, so neither the pattern nor a \\1 changes meaning there."""
+    if '\\' in rep: return False
+    try: return not re.compile(orig).flags & ~re.UNICODE and re.compile(f"(?P<_>)|(?P<{name}>(?:{orig}))").groups == 2
+    except re.error: return False
+
+def _standalone_rule(orig: str, rep: str, match_case: bool, word_boundary: bool):
+    """Compiles a regex rule on its own, with rep as an re.sub template (\\1, \\g<name>).
+    A bad pattern or replacement drops that rule only."""
+    flags = _GLOBAL_FLAGS_RE.match(orig)
+    prefix, body = (flags.group(), orig[flags.end():]) if flags else ('', orig)
+    pat = f"\\b(?:{body})\\b" if word_boundary else body
+    try:
+        compiled = re.compile(prefix + pat, 0 if match_case else re.IGNORECASE)
+        compiled.sub(rep, '')  # Parses the template up front
+        return compiled, rep
+    except re.error as e:
+        print(f"[NORMALIZER] Skipping invalid regex rule {orig!r}: {e}")
+        return None
+
+def _compile(build, allow_re2: bool = True):
+    """Compiles build(engine) with RE2 when installed and allowed, else with stdlib re."""
+    if re2 is not None and allow_re2:
+        try: return re2.compile(build(re2))
+        except Exception: pass
+    return re.compile(build(re))
+
+def _alternation(rules):
+    """One pattern and replacement callback for a run of plain/embeddable rules.
+    Case and word-boundary options are scoped per alternative, so mixed rules
+    still need only one scan of the text."""
+    replacements = {name: rep for name, _, rep, _, _ in rules}
+
+    def build(eng):
+        alternatives = []
+        for name, pat, _, match_case, word_boundary in rules:
+            if word_boundary: pat = f"\\b{pat}\\b"
+            if not match_case: pat = f"(?i:{pat})"
+            alternatives.append(f"(?P<{name}>{pat})")
+        return '|'.join(alternatives)
+
+    # RE2's \b is ASCII-only, so word-boundary rules stay on the Unicode-aware stdlib engine
+    # Replacement callback built once per rule set rather than per call
+    return _compile(build, allow_re2=not any(r[4] for r in rules)), (lambda m: replacements[m.lastgroup])
 
-def apply_custom_pronunciations(text: str, rules: List[Dict[str, Any]], ignore_list: List[str] = []) -> str:
+@functools.lru_cache(maxsize=16)
+def _build_matcher(rules_key: Tuple[Tuple[str, str, bool, bool, bool], ...], ignore_key: Tuple[str, ...]):
+    """Compiles the ignore list into one alternation and the pronunciation rules into as
+    few passes as possible: consecutive plain rules share one alternation, while regex
+    rules with flags, groups or backreferences each get a pass of their own, in rule order."""
+    ignore = [item for item in ignore_key if item]
+    ignore_re = _compile(lambda eng: "(?i:" + '|'.join(eng.escape(item) for item in ignore) + ")") if ignore else None
+
+    passes, run = [], []
+    for i, (orig, rep, match_case, word_boundary, is_regex) in enumerate(rules_key):
+        if not orig: continue
+        name = f"r{i}"
+        if not is_regex:
+            run.append((name, re.escape(orig), rep, match_case, word_boundary))
+            continue
+        standalone = _standalone_rule(orig, rep, match_case, word_boundary)
+        if standalone is None: continue
+        if _embeddable(name, orig, rep):
+            run.append((name, f"(?:{orig})", rep, match_case, word_boundary))
+            continue
+        if run: passes.append(_alternation(run)); run = []
+        passes.append(standalone)
+    if run: passes.append(_alternation(run))
+
+    return ignore_re, tuple(passes)
+
+def apply_pronunciation_key(text: str, rules_key: Tuple[Tuple[str, str, bool, bool, bool], ...], ignore_key: Tuple[str, ...] = ()) -> str:
+    """Like apply_custom_pronunciations, for callers that already hold the hashable
+    (original, replacement, match_case, word_boundary, is_regex) rule tuples."""
     # First fix PDF artifacts
     text = fix_broken_words(text)
-    
+
+    ignore_re, passes = _build_matcher(rules_key, ignore_key)
+
     # Apply ignore list
-    for item in ignore_list:
-        if item: text = re.sub(re.escape(item), "", text, flags=re.IGNORECASE)
+    if ignore_re: text = ignore_re.sub("", text)
+
+    # Apply pronunciation rules (single pass per alternation, first listed rule wins on overlap)
+    for pattern, repl in passes: text = pattern.sub(repl, text)
 
-    # Apply pronunciation rules
-    for rule in rules:
-        orig, rep = rule.get("original", ""), rule.get("replacement", "")
-        if not orig: continue
-        pat = re.escape(orig)
-        if rule.get("word_boundary"): pat = f"\\b{pat}\\b"
-        text = re.sub(pat, rep, text, flags=0 if rule.get("match_case") else re.IGNORECASE)
-            
     return text
 
+def rules_to_key(rules: List[Any]) -> Tuple[Tuple[str, str, bool, bool, bool], ...]:
+    """Hashable rule key from rule dicts or PronunciationRule models (read by attribute, no model_dump)."""
+    return tuple(
+        (r.get("original", ""), r.get("replacement", ""), bool(r.get("match_case")), bool(r.get("word_boundary")), bool(r.get("is_regex"))) if isinstance(r, dict)
+        else (r.original, r.replacement, r.match_case, r.word_boundary, bool(r.is_regex))
+        for r in rules)
+
+def apply_custom_pronunciations(text: str, rules: List[Any], ignore_list: List[str] = []) -> str:
+    return apply_pronunciation_key(text, rules_to_key(rules), tuple(ignore_list))
+
 def inject_pauses(text: str, pause_settings: Dict[str, int]) -> str:
     """
     Inject SSML-like pause markers based on punctuation.
@@ -63,6 +63,7 @@ class SynthesisRequest(BaseModel):
     speed: float = 1.0
     rules: List[PronunciationRule]
     ignore_list: List[str] = []
+    quality: Optional[str] = None  # "fast": use the int8 model when available
     pause_settings: Optional[Dict[str, int]] = {
         "comma": 300,
         "period": 600,
@@ -1,17 +1,18 @@
 from fastapi import APIRouter, HTTPException, BackgroundTasks
 from fastapi.responses import JSONResponse, FileResponse
 from ..state import export_status, ffmpeg_status, kokoro
-from ..config import content_dir, library_file, userdata_dir
+from ..config import content_dir, userdata_dir
 from ..models import ExportRequest
 from ..utils import get_language_from_voice
-import json
+from .library import get_library_store, load_doc
+from .tts import has_ascii_alnum, to_pcm16
+from ..state import pooled_create
 import re
-import io
+import collections
+import concurrent.futures
 import os
 import platform
 import subprocess
-import soundfile as sf
-from pydub import AudioSegment
 import sys
 from pathlib import Path
 
@@ -21,18 +22,72 @@ if str(base_dir_parent) not in sys.path:
     sys.path.append(str(base_dir_parent))
 
 try:
-    from logic.dependency_manager import FFMPEGInstaller, configure_pydub
+    from logic.dependency_manager import FFMPEGInstaller, get_ffmpeg_path
     from logic.smart_content_detector import filter_text_for_tts
-    from logic.text_normalizer import apply_custom_pronunciations
+    from logic.text_normalizer import apply_pronunciation_key, rules_to_key
 except ImportError:
     sys.path.append(str(base_dir_parent / "logic"))
-    from dependency_manager import FFMPEGInstaller, configure_pydub
+    from dependency_manager import FFMPEGInstaller, get_ffmpeg_path
     from smart_content_detector import filter_text_for_tts
-    from text_normalizer import apply_custom_pronunciations
+    from text_normalizer import apply_pronunciation_key, rules_to_key
 
 router = APIRouter()
 ffmpeg_installer = None
 
+# Chunks synthesized ahead of the one being assembled during audiobook export
+EXPORT_PREFETCH = 8
+# Export synthesizes on its own small pool rather than the shared TTS one, so a
+# book's worth of queued chunks never sits ahead of interactive playback
+EXPORT_WORKERS = 2
+_export_executor = concurrent.futures.ThreadPoolExecutor(
+    max_workers=EXPORT_WORKERS, thread_name_prefix="export"
+)
+# Silence written between chunks of the exported audiobook
+EXPORT_PAUSE_MS = 300
+
+_LONG_PARA_SPLIT_RE = re.compile(r"(?<=[.!?])\s+")
+_SAFE_FILENAME_RE = re.compile(r"[^\w\s-]")
+
+# Folder opener for this OS, picked once (the platform can't change at runtime)
+_OPEN_FOLDER = {
+    "Windows": lambda path: os.startfile(path),
+    "Darwin": lambda path: subprocess.Popen(["open", path]),
+    "Linux": lambda path: subprocess.Popen(["xdg-open", path]),
+}.get(platform.system())
+
+
+def synthesize_pcm16(text, voice, speed, lang):
+    """Synthesize one chunk and convert it to PCM16 bytes on the worker thread,
+    so conversion overlaps with synthesis of the following chunks."""
+    samples, sample_rate = pooled_create(text, voice=voice, speed=speed, lang=lang)
+    return to_pcm16(samples).tobytes(), sample_rate
+
+
+def open_mp3_encoder(output_path, sample_rate):
+    """Start an ffmpeg process encoding raw mono PCM16 from stdin to MP3."""
+    return subprocess.Popen(
+        [
+            get_ffmpeg_path() or "ffmpeg",
+            "-y",
+            "-loglevel",
+            "error",
+            "-f",
+            "s16le",
+            "-ar",
+            str(sample_rate),
+            "-ac",
+            "1",
+            "-i",
+            "pipe:0",
+            "-b:a",
+            "128k",
+            str(output_path),
+        ],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+    )
+
 
 @router.get("/api/ffmpeg/status")
 async def get_ffmpeg_status():
@@ -69,10 +124,6 @@ async def install_ffmpeg(background_tasks: BackgroundTasks):
             ffmpeg_status["is_installed"] = True
             ffmpeg_status["is_downloading"] = False
             ffmpeg_status["message"] = "Installation complete"
-            try:
-                configure_pydub()
-            except Exception as e:
-                print(f"Warning: Failed to configure pydub: {e}")
         else:
             ffmpeg_status["error"] = error
             ffmpeg_status["is_downloading"] = False
@@ -114,12 +165,9 @@ async def export_audio(request: ExportRequest, background_tasks: BackgroundTasks
         else:
             ffmpeg_status["is_installed"] = True
 
-    try:
-        configure_pydub()
-    except Exception as e:
-        raise HTTPException(
-            status_code=500, detail=f"Failed to configure audio encoder: {str(e)}"
-        )
+    # O(1) lookup in the in-memory library (also sees edits not yet flushed)
+    library = await get_library_store()
+    doc_item = library.get(request.doc_id)
 
     def export_task():
         global export_status
@@ -138,15 +186,8 @@ async def export_audio(request: ExportRequest, background_tasks: BackgroundTasks
                 export_status["is_exporting"] = False
                 return
 
-            with open(content_file, "r") as f:
-                doc_data = json.load(f)
-
-            with open(library_file, "r") as f:
-                library = json.load(f)
+            doc_data = load_doc(content_file)
 
-            doc_item = next(
-                (item for item in library if item.get("id") == request.doc_id), None
-            )
             if not doc_item:
                 export_status["error"] = "Document metadata not found"
                 export_status["is_exporting"] = False
@@ -154,76 +195,109 @@ async def export_audio(request: ExportRequest, background_tasks: BackgroundTasks
 
             chunks = []
             for page in doc_data.get("pages", []):
-                page_paragraphs = [p.strip() for p in page.split("\n") if p.strip()]
-                for para in page_paragraphs:
+                for para in filter(None, map(str.strip, page.split("\n"))):
                     if len(para) > 500:
-                        sentences = re.split(r"(?<=[.!?])\s+", para)
-                        chunks.extend([s.strip() for s in sentences if s.strip()])
+                        sentences = _LONG_PARA_SPLIT_RE.split(para)
+                        chunks.extend(filter(None, map(str.strip, sentences)))
                     else:
                         chunks.append(para)
 
             export_status["total"] = len(chunks)
-            audio_segments = []
-            rules_data = [r.model_dump() for r in request.rules]
+            # Rule key built once from the models for the whole book
+            rules_key = rules_to_key(request.rules)
+            ignore_key = tuple(request.ignore_list)
 
-            for i, chunk in enumerate(chunks):
-                if not export_status["is_exporting"]:
-                    export_status["error"] = "Export cancelled"
-                    return
+            lang = get_language_from_voice(request.voice)
+            speed = float(request.speed)
 
+            # Text preparation is cheap next to inference: do it all up front
+            prepared = []
+            for i, chunk in enumerate(chunks):
                 try:
                     filtered_text = filter_text_for_tts(chunk)
-                    if not filtered_text or not re.search(
-                        r"[a-zA-Z0-9]", filtered_text
-                    ):
-                        export_status["progress"] = i + 1
+                    if not filtered_text or not has_ascii_alnum(filtered_text):
+                        prepared.append(None)
                         continue
 
-                    processed_text = apply_custom_pronunciations(
-                        filtered_text, rules_data, request.ignore_list
+                    prepared.append(
+                        apply_pronunciation_key(filtered_text, rules_key, ignore_key)
                     )
-
-                    lang = get_language_from_voice(request.voice)
-
-                    # Use state_module.kokoro
-                    samples, sample_rate = state_module.kokoro.create(
-                        processed_text,
-                        voice=request.voice,
-                        speed=float(request.speed),
-                        lang=lang,
-                    )
-
-                    buffer = io.BytesIO()
-                    sf.write(
-                        buffer,
-                        samples.flatten(),
-                        sample_rate,
-                        format="WAV",
-                        subtype="PCM_16",
-                    )
-                    buffer.seek(0)
-                    audio_segment = AudioSegment.from_wav(buffer)
-                    audio_segments.append(audio_segment)
-                    audio_segments.append(AudioSegment.silent(duration=300))
-
                 except Exception as e:
                     print(f"Warning: Failed to process chunk {i}: {e}")
+                    prepared.append(None)
+
+            # Synthesize on the export pool with a bounded look-ahead window;
+            # results are consumed in submission order so the book stays in order
+            jobs = ((i, text) for i, text in enumerate(prepared) if text)
+            pending = collections.deque()
+
+            def submit_next():
+                job = next(jobs, None)
+                if job is not None:
+                    i, text = job
+                    future = _export_executor.submit(
+                        synthesize_pcm16, text, request.voice, speed, lang
+                    )
+                    pending.append((i, future))
 
-                export_status["progress"] = i + 1
+            for _ in range(EXPORT_PREFETCH):
+                submit_next()
 
-            if not audio_segments:
-                export_status["error"] = "No audio generated"
-                export_status["is_exporting"] = False
-                return
-
-            final_audio = sum(audio_segments)
-            safe_filename = re.sub(
-                r"[^\w\s-]", "", doc_item.get("fileName", "export")
+            safe_filename = _SAFE_FILENAME_RE.sub(
+                "", doc_item.get("fileName", "export")
             ).replace(" ", "_")
             output_filename = f"{safe_filename}_{request.voice}.mp3"
             output_path = userdata_dir / output_filename
 
-            final_audio.export(str(output_path), format="mp3", bitrate="128k")
+            # PCM is piped straight into ffmpeg as it is produced, so memory stays
+            # bounded by the look-ahead window instead of the whole decoded book.
+            # The encoder starts with the first chunk, once the sample rate is known.
+            encoder = None
+            pause = b""
+
+            try:
+                while pending:
+                    if not export_status["is_exporting"]:
+                        export_status["error"] = "Export cancelled"
+                        return
+
+                    i, future = pending.popleft()
+                    submit_next()
+                    try:
+                        pcm, sample_rate = future.result()
+                    except Exception as e:
+                        print(f"Warning: Failed to process chunk {i}: {e}")
+                    else:
+                        if encoder is None:
+                            encoder = open_mp3_encoder(output_path, sample_rate)
+                            pause = bytes(sample_rate * EXPORT_PAUSE_MS // 1000 * 2)
+                        encoder.stdin.write(pcm)
+                        encoder.stdin.write(pause)
+
+                    export_status["progress"] = i + 1
+
+                export_status["progress"] = len(chunks)
+
+                if encoder is None:
+                    export_status["error"] = "No audio generated"
+                    export_status["is_exporting"] = False
+                    return
+
+                encoder.stdin.close()
+                stderr = encoder.stderr.read()
+                if encoder.wait() != 0:
+                    raise RuntimeError(
+                        f"ffmpeg failed: {stderr.decode(errors='replace').strip()}"
+                    )
+                encoder = None
+            finally:
+                for _, future in pending:
+                    future.cancel()
+                if encoder is not None:
+                    # Cancelled or failed mid-stream: drop the partial file
+                    encoder.kill()
+                    encoder.wait()
+                    output_path.unlink(missing_ok=True)
 
             export_status["output_file"] = output_filename
             export_status["is_exporting"] = False
@@ -271,18 +345,12 @@ async def open_file_location(filename: str):
         if not folder_path.exists():
             folder_path.mkdir(parents=True, exist_ok=True)
 
-        system = platform.system()
-        folder_str = str(folder_path)
-
-        if system == "Windows":
-            os.startfile(folder_str)
-        elif system == "Darwin":
-            subprocess.Popen(["open", folder_str])
-        elif system == "Linux":
-            subprocess.Popen(["xdg-open", folder_str])
-        else:
+        if _OPEN_FOLDER is None:
             raise HTTPException(status_code=501, detail="Platform not supported")
 
+        folder_str = str(folder_path)
+        _OPEN_FOLDER(folder_str)
+
         return {"status": "opened", "folder": folder_str}
 
     except HTTPException:
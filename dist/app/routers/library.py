@@ -1,17 +1,34 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks, UploadFile, File
-from fastapi.responses import FileResponse
-import json
+from fastapi import (
+    APIRouter,
+    HTTPException,
+    BackgroundTasks,
+    UploadFile,
+    File,
+    Request,
+)
+from fastapi.responses import FileResponse, ORJSONResponse, Response
+import asyncio
+import bisect
+import concurrent.futures
+import orjson
 import os
 import time
-from bs4 import BeautifulSoup
-import ebooklib
-from ebooklib import epub
-from xhtml2pdf import pisa
+import functools
+import itertools
+import multiprocessing
+import re
+import shutil
 from ..config import library_file, content_dir, settings_file
 from ..models import LibraryItem, ContentItem
-from ..utils import safe_save_json
+from ..utils import safe_save_json, load_json, load_json_cached, etag_matches
 import sys
 from pathlib import Path
+from typing import Dict, Optional
+
+try:
+    import msgpack  # Optional: Accept: application/msgpack on content reads
+except ImportError:
+    msgpack = None
 
 # Add app logic to path for imports if needed
 base_dir = Path(__file__).parent.parent
@@ -24,6 +41,11 @@ try:
         detect_headers_footers,
         apply_header_footer_filter,
     )
+    from logic.epub_converter import (
+        convert_epub_to_pdf,
+        EpubReadError,
+        PdfRenderError,
+    )
 except ImportError:
     # Add parent dir to path to find logic module
     sys.path.append(str(base_dir))
@@ -33,12 +55,142 @@ except ImportError:
             detect_headers_footers,
             apply_header_footer_filter,
         )
+        from logic.epub_converter import (
+            convert_epub_to_pdf,
+            EpubReadError,
+            PdfRenderError,
+        )
     except ImportError:
         # Fallback if logic folder is in a different relative location
         pass
 
 router = APIRouter()
 
+# --- In-memory library store ---
+# id -> item in file order. Loaded once; edits are flushed to disk shortly after
+# (rapid edits such as progress saves on page turns coalesce into one write).
+# Edits are coalesced: at most one library.json write per interval
+LIBRARY_FLUSH_INTERVAL = 2.0
+_library: Optional[Dict[str, dict]] = None
+_library_lock = asyncio.Lock()
+_write_lock = asyncio.Lock()
+_dirty = False
+_flush_task: Optional[asyncio.Task] = None
+
+
+async def get_library_store() -> Dict[str, dict]:
+    global _library
+    async with _library_lock:
+        if _library is None:
+            try:
+                items = await asyncio.to_thread(load_json_cached, library_file)
+            except Exception:
+                items = []
+            _library = {item.get("id"): item for item in items}
+        return _library
+
+
+async def flush_library():
+    """Write pending in-memory library edits to disk now (no-op when clean)."""
+    global _dirty
+    async with _write_lock:
+        if not _dirty or _library is None:
+            return
+        _dirty = False
+        # The snapshot is taken here, on the event loop, before the thread runs
+        try:
+            await asyncio.to_thread(
+                safe_save_json, library_file, list(_library.values())
+            )
+        except BaseException:
+            _dirty = True
+            raise
+
+
+async def _flush_later():
+    global _flush_task
+    try:
+        await asyncio.sleep(LIBRARY_FLUSH_INTERVAL)
+    finally:
+        _flush_task = None  # Edits from here on start the next interval
+    await flush_library()
+
+
+def _schedule_flush():
+    """Mark the library dirty; the first edit of an interval starts its flush."""
+    global _dirty, _flush_task
+    _dirty = True
+    if _flush_task is None:
+        _flush_task = asyncio.create_task(_flush_later())
+
+
+# --- Parsed document cache ---
+# Keyed by (path, mtime_ns, size): a re-saved book gets a new key, so entries
+# never go stale. Cached values are shared and must be treated as read-only.
+@functools.lru_cache(maxsize=8)
+def _load_doc(path_str: str, mtime_ns: int, size: int) -> dict:
+    return load_json(Path(path_str))
+
+
+def load_doc(file_path: Path) -> dict:
+    """Parsed content file, from cache while unchanged on disk (blocking)."""
+    st = file_path.stat()
+    return _load_doc(str(file_path), st.st_mtime_ns, st.st_size)
+
+
+@functools.lru_cache(maxsize=256)
+def _page_view(path_str: str, mtime_ns: int, size: int, page_index: int, mode: str):
+    """(headers, footers, filtered_text) for one page of a cached document."""
+    from logic.smart_content_detector import (
+        detect_headers_footers,
+        apply_header_footer_filter,
+    )
+
+    pages = _load_doc(path_str, mtime_ns, size).get("pages", [])
+    page_text = pages[page_index]
+    noise = detect_headers_footers(pages, page_index)
+
+    if mode in ["clean", "dim"]:
+        filtered_text = apply_header_footer_filter(
+            page_text, noise["headers"], noise["footers"], mode
+        )
+    else:
+        filtered_text = page_text
+    return noise["headers"], noise["footers"], filtered_text
+
+
+UPLOAD_CHUNK_SIZE = 1 << 20
+EPUB_POOL_WORKERS = 2
+_epub_pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
+
+
+def _save_upload(src, dest: Path):
+    """Copy an upload's spooled file to disk in fixed-size chunks (blocking)."""
+    src.seek(0)
+    with open(dest, "wb") as f:
+        shutil.copyfileobj(src, f, UPLOAD_CHUNK_SIZE)
+
+
+def _get_epub_pool() -> concurrent.futures.ProcessPoolExecutor:
+    """Worker processes for EPUB conversion, started on the first upload.
+    Always spawned (the Windows default), never forked from the threaded
+    server. A worker re-runs main.py as __mp_main__, which imports the server
+    only under its __main__ guard, so it loads just logic.epub_converter."""
+    global _epub_pool
+    if _epub_pool is None:
+        _epub_pool = concurrent.futures.ProcessPoolExecutor(
+            max_workers=EPUB_POOL_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _epub_pool
+
+
+def shutdown_epub_pool():
+    global _epub_pool
+    if _epub_pool is not None:
+        _epub_pool.shutdown(wait=False, cancel_futures=True)
+        _epub_pool = None
+
 
 @router.post("/api/convert/epub")
 async def convert_epub(background_tasks: BackgroundTasks, file: UploadFile = File(...)):
@@ -60,35 +212,22 @@ async def convert_epub(background_tasks: BackgroundTasks, file: UploadFile = Fil
             print(f"[CLEANUP ERROR] {e}")
 
     try:
-        with open(temp_epub, "wb") as f:
-            content = await file.read()
-            f.write(content)
-
+        # Memory stays bounded for big books, and the disk writes run off the loop
+        await asyncio.to_thread(_save_upload, file.file, temp_epub)
+        # Parsing and rendering hold the GIL for seconds: run them in a worker
+        # process so TTS requests keep being served meanwhile
+        loop = asyncio.get_running_loop()
         try:
-            book = epub.read_epub(str(temp_epub))
-        except Exception:
-            cleanup_files()
-            raise HTTPException(
-                status_code=400, detail="Cannot read protected file (DRM)"
+            await loop.run_in_executor(
+                _get_epub_pool(), convert_epub_to_pdf, temp_epub, temp_pdf
             )
-
-        html_content = "<html><body>"
-        for item in book.get_items():
-            if item.get_type() == ebooklib.ITEM_DOCUMENT:
-                soup = BeautifulSoup(item.get_content(), "html.parser")
-                body = soup.find("body")
-                if body:
-                    html_content += str(body)
-                else:
-                    html_content += str(soup)
-        html_content += "</body></html>"
-
-        with open(temp_pdf, "wb") as f:
-            pisa_status = pisa.CreatePDF(html_content, dest=f)
-
-        if pisa_status.err:
-            cleanup_files()
-            raise HTTPException(status_code=500, detail="PDF conversion failed")
+        except EpubReadError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except PdfRenderError as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        except concurrent.futures.process.BrokenProcessPool:
+            shutdown_epub_pool()  # A worker died; start fresh on the next upload
+            raise
 
         background_tasks.add_task(cleanup_files)
         return FileResponse(
@@ -105,45 +244,28 @@ async def convert_epub(background_tasks: BackgroundTasks, file: UploadFile = Fil
 
 @router.get("/api/library")
 async def get_library():
-    try:
-        with open(library_file, "r") as f:
-            return json.load(f)
-    except Exception:
-        return []
+    library = await get_library_store()
+    # Returned as a Response so FastAPI skips the jsonable_encoder walk
+    return ORJSONResponse(list(library.values()))
 
 
 @router.post("/api/library")
 async def save_library_item(item: LibraryItem):
-    try:
-        with open(library_file, "r") as f:
-            library = json.load(f)
-    except Exception:
-        library = []
-
-    found = False
-    for i, existing in enumerate(library):
-        if existing.get("id") == item.id:
-            library[i] = item.model_dump()
-            found = True
-            break
-    if not found:
-        library.append(item.model_dump())
-
-    safe_save_json(library_file, library)
+    library = await get_library_store()
+    # Existing ids keep their position; new ones are appended
+    library[item.id] = item.model_dump()
+    _schedule_flush()
     return {"status": "ok"}
 
 
 @router.delete("/api/library/{doc_id}")
 async def delete_library_item(doc_id: str):
     try:
-        with open(library_file, "r") as f:
-            library = json.load(f)
-
-        len_before = len(library)
-        library = [item for item in library if item.get("id") != doc_id]
+        library = await get_library_store()
 
-        if len(library) < len_before:
-            safe_save_json(library_file, library)
+        if library.pop(doc_id, None) is not None:
+            _schedule_flush()
+            await flush_library()
             for ext in [".json", ".pdf", ".epub"]:
                 file_path = content_dir / f"{doc_id}{ext}"
                 if file_path.exists():
@@ -158,72 +280,156 @@ async def delete_library_item(doc_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# safe_save_json writes compact orjson in insertion order, so a document saved by
+# save_content ends with its smart_start_page as the top-level object's last key.
+# Anchored at the end of the file, this can't match inside page text or a nested value.
+_SMART_START_TAIL = re.compile(rb',"smart_start_page":\d+\}\Z')
+
+
 @router.get("/api/library/content/{doc_id}")
-async def get_content(doc_id: str):
+async def get_content(doc_id: str, request: Request):
     file_path = content_dir / f"{doc_id}.json"
-    if not file_path.exists():
+    try:
+        st = file_path.stat()
+    except FileNotFoundError:
         raise HTTPException(status_code=404)
-    with open(file_path, "r") as f:
-        data = json.load(f)
+    accept = request.headers.get("accept", "")
+    wants_msgpack = msgpack is not None and "application/msgpack" in accept
 
-    pages = data.get("pages", [])
-    if pages:
-        # Import needs to happen or be available
+    # Conditional GET: an unchanged book costs a stat() and an empty 304
+    etag = f'W/"{st.st_mtime_ns:x}-{st.st_size:x}{"-mp" if wants_msgpack else ""}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Accept"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    raw = await asyncio.to_thread(file_path.read_bytes)
+
+    # Saved with its smart start already: send the file as-is, no parse/re-encode
+    if _SMART_START_TAIL.search(raw) and not wants_msgpack:
+        return Response(content=raw, media_type="application/json", headers=headers)
+
+    data = orjson.loads(raw)
+    if "smart_start_page" not in data:
+        # Documents saved before the key was stored on save
         from logic.smart_content_detector import find_content_start_page
 
-        smart_start = find_content_start_page(pages)
-        data["smart_start_page"] = smart_start
+        pages = data.get("pages", [])
+        data["smart_start_page"] = (
+            await asyncio.to_thread(find_content_start_page, pages) if pages else 0
+        )
 
-    return data
+    if wants_msgpack:
+        # Length-prefixed strings, no escaping: smaller and faster to decode for books
+        return Response(
+            content=msgpack.packb(data),
+            media_type="application/msgpack",
+            headers=headers,
+        )
+    return ORJSONResponse(data, headers=headers)
 
 
 @router.post("/api/library/content")
 async def save_content(item: ContentItem):
-    safe_save_json(content_dir / f"{item.id}.json", item.model_dump())
+    from logic.smart_content_detector import find_content_start_page
+
+    data = item.model_dump()
+    # Always stored, as the last key, so get_content can serve the file verbatim
+    data["smart_start_page"] = (
+        await asyncio.to_thread(find_content_start_page, item.pages)
+        if item.pages
+        else 0
+    )
+    await asyncio.to_thread(safe_save_json, content_dir / f"{item.id}.json", data)
     return {"status": "ok"}
 
 
 @router.get("/api/library/content/{doc_id}/page/{page_index}")
 async def get_page_with_filter(doc_id: str, page_index: int):
     file_path = content_dir / f"{doc_id}.json"
-    if not file_path.exists():
+    try:
+        st = file_path.stat()
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Document not found")
+    doc_key = (str(file_path), st.st_mtime_ns, st.st_size)
 
-    with open(file_path, "r") as f:
-        data = json.load(f)
+    data = await asyncio.to_thread(_load_doc, *doc_key)
 
     pages = data.get("pages", [])
     if page_index < 0 or page_index >= len(pages):
         raise HTTPException(status_code=400, detail="Invalid page index")
 
-    with open(settings_file, "r") as f:
-        settings = json.load(f)
+    settings = await asyncio.to_thread(load_json_cached, settings_file)
 
     mode = settings.get("header_footer_mode", "off")
-    page_text = pages[page_index]
 
-    from logic.smart_content_detector import (
-        detect_headers_footers,
-        apply_header_footer_filter,
+    # Header/footer detection compares neighbouring pages: cached per page/mode
+    headers, footers, filtered_text = await asyncio.to_thread(
+        _page_view, *doc_key, page_index, mode
     )
 
-    noise = detect_headers_footers(pages, page_index)
+    return ORJSONResponse(
+        {
+            "page_index": page_index,
+            "original_text": pages[page_index],
+            "filtered_text": filtered_text,
+            "headers": headers,
+            "footers": footers,
+            "mode": mode,
+        }
+    )
 
-    if mode in ["clean", "dim"]:
-        filtered_text = apply_header_footer_filter(
-            page_text, noise["headers"], noise["footers"], mode
-        )
-    else:
-        filtered_text = page_text
 
-    return {
-        "page_index": page_index,
-        "original_text": page_text,
-        "filtered_text": filtered_text,
-        "headers": noise["headers"],
-        "footers": noise["footers"],
-        "mode": mode,
-    }
+@functools.lru_cache(maxsize=64)
+def _search_pattern(q: str) -> "re.Pattern":
+    # The UI searches as the user types: the same queries recur
+    return re.compile(re.escape(q), re.IGNORECASE)
+
+
+# Joins pages for search; never part of a query, so no match can span pages
+_PAGE_SEP = "\x00"
+
+
+@functools.lru_cache(maxsize=4)
+def _search_text(path_str: str, mtime_ns: int, size: int):
+    """(all pages joined by _PAGE_SEP, start offset of each page), per document."""
+    pages = _load_doc(path_str, mtime_ns, size).get("pages", [])
+    starts = list(itertools.accumulate((len(p) + 1 for p in pages[:-1]), initial=0))
+    return _PAGE_SEP.join(pages), starts
+
+
+def _search_sync(file_path: Path, q: str) -> list:
+    """Per-page match counts and up to three snippets each (blocking)."""
+    st = file_path.stat()
+    text, starts = _search_text(str(file_path), st.st_mtime_ns, st.st_size)
+
+    # One C-level scan over the whole book; pages are resolved by bisecting the
+    # offsets only when a match lands on a new page
+    results = []
+    page = None
+    page_start = page_end = 0
+    for m in _search_pattern(q).finditer(text):
+        pos = m.start()
+        if page is None or pos >= page_end:
+            page_index = bisect.bisect_right(starts, pos) - 1
+            page_start = starts[page_index]
+            if page_index + 1 < len(starts):
+                page_end = starts[page_index + 1] - 1
+            else:
+                page_end = len(text)
+            page = {"page_index": page_index, "match_count": 0, "matches": []}
+            results.append(page)
+
+        page["match_count"] += 1
+        if len(page["matches"]) < 3:
+            context_start = max(page_start, pos - 50)
+            context_end = min(page_end, m.end() + 50)
+            snippet = text[context_start:context_end]
+            if context_start > page_start:
+                snippet = "..." + snippet
+            if context_end < page_end:
+                snippet = snippet + "..."
+            page["matches"].append({"position": pos - page_start, "snippet": snippet})
+    return results
 
 
 @router.get("/api/library/search/{doc_id}")
@@ -235,47 +441,16 @@ async def search_book(doc_id: str, q: str):
     if not file_path.exists():
         raise HTTPException(status_code=404, detail="Document not found")
 
-    with open(file_path, "r") as f:
-        data = json.load(f)
-
-    pages = data.get("pages", [])
-    query_lower = q.lower()
-    results = []
-    total_matches = 0
-
-    for page_index, page_text in enumerate(pages):
-        page_lower = page_text.lower()
-        match_count = page_lower.count(query_lower)
-
-        if match_count > 0:
-            matches = []
-            start = 0
-            while True:
-                pos = page_lower.find(query_lower, start)
-                if pos == -1:
-                    break
-                context_start = max(0, pos - 50)
-                context_end = min(len(page_text), pos + len(q) + 50)
-                snippet = page_text[context_start:context_end]
-                if context_start > 0:
-                    snippet = "..." + snippet
-                if context_end < len(page_text):
-                    snippet = snippet + "..."
-                matches.append({"position": pos, "snippet": snippet})
-                start = pos + 1
-
-            results.append(
-                {
-                    "page_index": page_index,
-                    "match_count": match_count,
-                    "matches": matches[:3],
-                }
-            )
-            total_matches += match_count
-
-    return {
-        "results": results,
-        "total_matches": total_matches,
-        "query": q,
-        "pages_with_matches": len(results),
-    }
+    if _PAGE_SEP in q:
+        results = []
+    else:
+        results = await asyncio.to_thread(_search_sync, file_path, q)
+
+    return ORJSONResponse(
+        {
+            "results": results,
+            "total_matches": sum(r["match_count"] for r in results),
+            "query": q,
+            "pages_with_matches": len(results),
+        }
+    )
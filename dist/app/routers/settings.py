@@ -1,19 +1,20 @@
 from fastapi import APIRouter
-import json
+from fastapi.responses import ORJSONResponse
+import asyncio
 from ..config import settings_file
 from ..models import AppSettings
-from ..utils import safe_save_json
+from ..utils import safe_save_json, load_json_cached
 
 router = APIRouter()
 
 
 @router.get("/api/settings")
 async def get_settings():
-    with open(settings_file, "r") as f:
-        return json.load(f)
+    settings = await asyncio.to_thread(load_json_cached, settings_file)
+    return ORJSONResponse(settings)
 
 
 @router.post("/api/settings")
 async def save_settings(settings: AppSettings):
-    safe_save_json(settings_file, settings.model_dump())
+    await asyncio.to_thread(safe_save_json, settings_file, settings.model_dump())
     return {"status": "ok"}
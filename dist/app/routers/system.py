@@ -1,9 +1,9 @@
 from fastapi import APIRouter, HTTPException, BackgroundTasks
 from fastapi.responses import JSONResponse
 from ..state import audio_cache, kokoro, system_status
-from ..utils import safe_save_json
+from ..utils import safe_save_json, load_json_cached, get_language_from_voice
 from ..config import base_dir, settings_file, get_app_anchored_path
-import json
+import asyncio
 import sys
 from pathlib import Path
 
@@ -37,7 +37,7 @@ router = APIRouter()
 # Ideally, we should move 'load_engine' to state.py or a logic module.
 # For now, let's redefine it here but make sure it updates the state objects.
 
-from ..state import PatchedKokoro
+from ..state import PatchedKokoro, create_engine
 
 
 def load_engine_logic(requested_mode=None):
@@ -47,8 +47,7 @@ def load_engine_logic(requested_mode=None):
 
     if requested_mode is None:
         try:
-            with open(settings_file, "r") as f:
-                settings = json.load(f)
+            settings = load_json_cached(settings_file)
             requested_mode = settings.get("engine_mode", "gpu")
         except Exception:
             requested_mode = "gpu"
@@ -101,16 +100,50 @@ def load_engine_logic(requested_mode=None):
 
         if state_module.kokoro is not None:
             print("[ENGINE] Unloading previous model...")
+            state_module.engine_pool = None
+            state_module.fast_engine = None
             state_module.kokoro = None  # GC old model
+            system_status["voices"] = []
+            system_status["voices_set"] = frozenset()
 
         print(f"[ENGINE] Initializing {actual_mode.upper()} model...")
 
         if actual_mode == "gpu":
             print("[ENGINE] Using PatchedKokoro for GPU model compatibility...")
-            state_module.kokoro = PatchedKokoro(str(model_to_load), str(voices_path))
+            engine_cls, engine_kwargs = PatchedKokoro, {}
         else:
+            # Int8 dynamic-quantized ops are CPU kernels; keep this model on CPU
             print("[ENGINE] Using default Kokoro for CPU model...")
-            state_module.kokoro = Kokoro(str(model_to_load), str(voices_path))
+            engine_cls, engine_kwargs = Kokoro, {"allow_accelerators": False}
+
+        state_module.kokoro = create_engine(
+            engine_cls,
+            str(model_to_load),
+            str(voices_path),
+            intra_op_threads=state_module.pool_intra_op_threads(),
+            **engine_kwargs,
+        )
+        state_module.build_engine_pool(
+            engine_cls, str(model_to_load), str(voices_path), **engine_kwargs
+        )
+        # The quantized model is already loaded: fast requests share it
+        state_module.fast_engine = (
+            state_module.kokoro if model_to_load == cpu_model_path else None
+        )
+
+        print(f"[ENGINE] Execution provider: {system_status['provider']}")
+
+        # Voice list is fixed for a loaded model: read it once
+        engine = state_module.kokoro
+        voices = list(engine.get_voices())
+        system_status["voices"] = voices
+        system_status["voices_set"] = getattr(engine, "voice_names", frozenset(voices))
+
+        if voices:
+            warm_voice = "af_sky" if "af_sky" in voices else voices[0]
+            state_module.warm_up_engines(
+                warm_voice, get_language_from_voice(warm_voice)
+            )
 
         if actual_mode != requested_mode:
             warn = f"Using {actual_mode.upper()} model (your selected {requested_mode.upper()} model not found)"
@@ -134,8 +167,7 @@ def load_engine_logic(requested_mode=None):
 @router.get("/api/system/status")
 async def get_status():
     try:
-        with open(settings_file, "r") as f:
-            settings = json.load(f)
+        settings = await asyncio.to_thread(load_json_cached, settings_file)
         current_engine_mode = settings.get("engine_mode", "gpu")
     except Exception:
         current_engine_mode = "gpu"
@@ -154,8 +186,9 @@ async def get_status():
         "is_loading": system_status["is_loading"],
         "is_downloading": system_status["is_downloading"],
         "last_error": system_status["last_error"],
-        "voices": state_module.kokoro.get_voices() if state_module.kokoro else [],
+        "voices": system_status["voices"] if state_module.kokoro else [],
         "engine_mode": current_engine_mode,
+        "provider": system_status["provider"],
         "available_models": available_models,
     }
 
@@ -172,8 +205,7 @@ async def run_setup(background_tasks: BackgroundTasks, model_type: str = None):
             target_model = model_type
             if target_model is None:
                 try:
-                    with open(settings_file, "r") as f:
-                        settings = json.load(f)
+                    settings = load_json_cached(settings_file)
                     target_model = settings.get("engine_mode", "gpu")
                 except:
                     target_model = "gpu"
@@ -218,10 +250,9 @@ async def switch_engine(background_tasks: BackgroundTasks, target_mode: str):
         }
 
     try:
-        with open(settings_file, "r") as f:
-            settings = json.load(f)
+        settings = await asyncio.to_thread(load_json_cached, settings_file)
         settings["engine_mode"] = target_mode
-        safe_save_json(settings_file, settings)
+        await asyncio.to_thread(safe_save_json, settings_file, settings)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -274,7 +305,7 @@ async def download_specific_model(background_tasks: BackgroundTasks, model_type:
 @router.post("/api/system/clear-cache")
 async def clear_all_cache():
     try:
-        deleted, freed = audio_cache.clear_all()
+        deleted, freed = await asyncio.to_thread(audio_cache.clear_all)
         return {
             "status": "success",
             "files_deleted": deleted,
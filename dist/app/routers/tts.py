@@ -1,11 +1,14 @@
 from fastapi import APIRouter, HTTPException, BackgroundTasks
-from fastapi.responses import StreamingResponse
+from fastapi.responses import Response, StreamingResponse
 import numpy as np
+import asyncio
+import collections
 import io
 import re
+import struct
 import hashlib
-import soundfile as sf
 import concurrent.futures
+import functools
 from typing import Dict
 import sys
 import json
@@ -18,64 +21,157 @@ if str(base_dir_parent) not in sys.path:
 
 try:
     from logic.smart_content_detector import filter_text_for_tts
-    from logic.text_normalizer import apply_custom_pronunciations
+    from logic.text_normalizer import apply_pronunciation_key, rules_to_key
 except ImportError:
     sys.path.append(str(base_dir_parent / "logic"))
     from smart_content_detector import filter_text_for_tts
-    from text_normalizer import apply_custom_pronunciations
+    from text_normalizer import apply_pronunciation_key, rules_to_key
 
-from ..state import audio_cache, kokoro
+from ..state import audio_cache, kokoro, system_status, pooled_create, fast_create
 from ..models import SynthesisRequest
-from ..utils import get_language_from_voice
+from ..utils import get_language_from_voice, load_json_cached
 from ..config import base_dir
 from kokoro_onnx import SAMPLE_RATE
 
 router = APIRouter()
 
+# Segment classification patterns, compiled once instead of per request
+_PAUSE_SPLIT_RE = re.compile(r"([,\.!\?:;。，！？：；、]+|\n)")
+_PUNCTUATION_ONLY_RE = re.compile(r"^[,\.!\?:;。，！？：；、]+$")
+_SPEAKABLE_RE = re.compile(
+    r"[a-zA-Z0-9\u3000-\u303f\u3040-\u309f\u30a0-\u30ff\uff00-\uff9f\u4e00-\u9faf\u3400-\u4dbf]"
+)
+
+# Shared worker pool for segment synthesis. ONNX Runtime sessions are safe to
+# run concurrently, so one engine serves all workers without extra model copies
+_synth_executor = concurrent.futures.ThreadPoolExecutor(
+    max_workers=4, thread_name_prefix="tts"
+)
+
+# 100 ms of silence returned for text with nothing speakable (read-only, shared)
+_SILENCE_100MS = np.zeros(SAMPLE_RATE // 10, dtype=np.float32)
+_SILENCE_100MS.setflags(write=False)
+
+# Sentences synthesized ahead of the one currently being streamed
+STREAM_PREFETCH = 2
+
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?。！？])\s+")
+
+# Every byte except ASCII letters and digits (delete table for the checks below)
+_ASCII_NON_ALNUM = bytes(c for c in range(256) if not chr(c).isalnum() or c > 127)
+
+_PAUSE_CHAR_MAP = {
+    ",": "comma",
+    "，": "comma",
+    "、": "comma",
+    ".": "period",
+    "。": "period",
+    "?": "question",
+    "？": "question",
+    "!": "exclamation",
+    "！": "exclamation",
+    ":": "colon",
+    "：": "colon",
+    ";": "semicolon",
+    "；": "semicolon",
+}
+
 # --- Helpers moved from server.py ---
 
 
-def safe_concat(audio_list):
-    clean_list = []
-    for a in audio_list:
-        if isinstance(a, np.ndarray):
-            if a.ndim == 2:
-                a = a.squeeze()
-            if a.ndim > 2:
-                a = a.flatten()
-        clean_list.append(a)
-    if not clean_list:
-        return np.array([], dtype=np.float32)
-    return np.concatenate(clean_list)
+def has_speakable(text: str) -> bool:
+    """True if text contains anything _SPEAKABLE_RE would match."""
+    first = text[:1]
+    # Typical sentence: starts with an ASCII letter or digit
+    if first.isascii() and first.isalnum():
+        return True
+    # ASCII punctuation runs: one C-level delete pass instead of a regex scan
+    if text.isascii():
+        return bool(text.encode("ascii").translate(None, _ASCII_NON_ALNUM))
+    return _SPEAKABLE_RE.search(text) is not None
+
+
+def has_ascii_alnum(text: str) -> bool:
+    """True if text contains an ASCII letter or digit (same as [a-zA-Z0-9])."""
+    first = text[:1]
+    if first.isascii() and first.isalnum():
+        return True
+    # Non-ASCII characters are dropped by the encode, the rest by the delete table
+    return bool(text.encode("ascii", "ignore").translate(None, _ASCII_NON_ALNUM))
+
+
+def to_pcm16(samples: np.ndarray) -> np.ndarray:
+    """Convert a float waveform to int16 PCM (reshape is a view, flatten copies).
+    Scaling allocates one float32 buffer; clipping then happens in place."""
+    pcm = np.multiply(samples.reshape(-1), 32767.0, dtype=np.float32)
+    np.clip(pcm, -32768, 32767, out=pcm)
+    return pcm.astype(np.int16)
+
+
+def wav_header(sample_rate: int, data_size: int = 0xFFFFFFFF) -> bytes:
+    """44-byte mono PCM_16 WAV header. The default sizes are open-ended, for
+    streamed audio whose length is not known up front."""
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF",
+        min(data_size + 36, 0xFFFFFFFF),
+        b"WAVE",
+        b"fmt ",
+        16,
+        1,
+        1,
+        sample_rate,
+        sample_rate * 2,
+        2,
+        16,
+        b"data",
+        data_size,
+    )
+
+
+def pcm16_wav(samples: np.ndarray, sample_rate: int) -> bytes:
+    """Complete mono PCM_16 WAV file; skips libsndfile and its extra buffer copy."""
+    pcm = to_pcm16(samples)
+    return wav_header(sample_rate, pcm.nbytes) + pcm.tobytes()
+
+
+# Complete WAV file for blank/punctuation-only text, encoded once at import
+SILENCE_WAV_100MS = pcm16_wav(_SILENCE_100MS, SAMPLE_RATE)
+
+
+@functools.lru_cache(maxsize=512)
+def _normalize_text(text: str, rules_key: tuple, ignore_key: tuple) -> str:
+    # Readers replay and prefetch the same sentences (and the stream and
+    # WAV endpoints see the same text), so repeat normalization is a lookup
+    return apply_pronunciation_key(filter_text_for_tts(text), rules_key, ignore_key)
+
+
+def prepare_text(request: SynthesisRequest) -> str:
+    """Strip dimmed sections and apply pronunciation rules / ignore list."""
+    try:
+        # Hashable key straight from the models: no model_dump(), and the
+        # compiled matcher for an unchanged rule set comes from cache
+        rules_key = rules_to_key(request.rules)
+        return _normalize_text(request.text, rules_key, tuple(request.ignore_list))
+    except Exception:
+        return filter_text_for_tts(request.text)
 
 
 def synthesize_with_pauses(
-    text: str, voice: str, speed: float, pause_settings: Dict[str, int]
+    text: str,
+    voice: str,
+    speed: float,
+    pause_settings: Dict[str, int],
+    create=pooled_create,
 ):
     import app.state as state_module
 
     lang = get_language_from_voice(voice)
-    segments = re.split(r"([,\.!\?:;。，！？：；、]+|\n)", text)
+    segments = _PAUSE_SPLIT_RE.split(text)
     sample_rate = SAMPLE_RATE
     plan = []
     last_was_punctuation = False
 
-    char_map = {
-        ",": "comma",
-        "，": "comma",
-        "、": "comma",
-        ".": "period",
-        "。": "period",
-        "?": "question",
-        "？": "question",
-        "!": "exclamation",
-        "！": "exclamation",
-        ":": "colon",
-        "：": "colon",
-        ";": "semicolon",
-        "；": "semicolon",
-    }
-
     for i, segment in enumerate(segments):
         clean_segment = segment.strip()
         if segment == "\n":
@@ -88,21 +184,18 @@ def synthesize_with_pauses(
         if not clean_segment:
             continue
 
-        if re.match(r"^[,\.!\?:;。，！？：；、]+$", clean_segment):
+        if _PUNCTUATION_ONLY_RE.match(clean_segment):
             last_char = clean_segment[-1]
             pause_ms = 0
 
-            vocab_key = char_map.get(last_char)
+            vocab_key = _PAUSE_CHAR_MAP.get(last_char)
             if vocab_key:
                 pause_ms = pause_settings.get(vocab_key, 300)
 
             plan.append({"type": "silence", "ms": pause_ms})
             last_was_punctuation = True
         else:
-            if re.search(
-                r"[a-zA-Z0-9\u3000-\u303f\u3040-\u309f\u30a0-\u30ff\uff00-\uff9f\u4e00-\u9faf\u3400-\u4dbf]",
-                clean_segment,
-            ):
+            if has_speakable(clean_segment):
                 plan.append({"type": "tts", "text": clean_segment, "index": i})
                 last_was_punctuation = False
 
@@ -110,43 +203,51 @@ def synthesize_with_pauses(
     audio_map = {}
 
     if tts_tasks and state_module.kokoro:
-        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
-            future_to_idx = {
-                executor.submit(
-                    state_module.kokoro.create,
-                    t["text"],
-                    voice=voice,
-                    speed=speed,
-                    lang=lang,
-                ): t["index"]
-                for t in tts_tasks
-            }
-            for future in concurrent.futures.as_completed(future_to_idx):
-                idx = future_to_idx[future]
-                try:
-                    samples, _ = future.result()
-                    audio_map[idx] = samples.flatten()
-                except Exception as e:
-                    print(f"Segment {idx} failed: {e}")
-                    audio_map[idx] = None
-
-    final_segments = []
+        future_to_idx = {
+            _synth_executor.submit(
+                create,
+                t["text"],
+                voice=voice,
+                speed=speed,
+                lang=lang,
+            ): t["index"]
+            for t in tts_tasks
+        }
+        for future in concurrent.futures.as_completed(future_to_idx):
+            idx = future_to_idx[future]
+            try:
+                samples, _ = future.result()
+                audio_map[idx] = samples.reshape(-1)  # View; copied once below
+            except Exception as e:
+                print(f"Segment {idx} failed: {e}")
+                audio_map[idx] = None
+
+    # Lay the plan out in one preallocated buffer: pauses are already zero there,
+    # and each clip is copied exactly once
+    lengths = []
     for item in plan:
         if item["type"] == "silence":
-            pause_samples = int((item["ms"] / 1000.0) * sample_rate)
-            if pause_samples > 0:
-                final_segments.append(np.zeros(pause_samples, dtype=np.float32))
-        elif item["type"] == "tts":
+            lengths.append(max(int((item["ms"] / 1000.0) * sample_rate), 0))
+        else:
             audio = audio_map.get(item["index"])
-            if audio is not None:
-                final_segments.append(audio)
+            lengths.append(0 if audio is None else audio.size)
 
-    if final_segments:
-        return safe_concat(final_segments), sample_rate
-    return np.zeros(int(sample_rate * 0.1), dtype=np.float32), sample_rate
+    total = sum(lengths)
+    if not total:
+        return _SILENCE_100MS, sample_rate
 
+    final_audio = np.zeros(total, dtype=np.float32)
+    pos = 0
+    for item, length in zip(plan, lengths):
+        if item["type"] == "tts" and length:
+            final_audio[pos : pos + length] = audio_map[item["index"]]
+        pos += length
+    return final_audio, sample_rate
 
-def generate_cache_key(text, voice, speed, pause_settings, rules, ignore_list):
+
+def generate_cache_key(
+    text, voice, speed, pause_settings, rules, ignore_list, quality=None
+):
     lang = get_language_from_voice(voice)
     cache_data = {
         "text": text,
@@ -157,6 +258,9 @@ def generate_cache_key(text, voice, speed, pause_settings, rules, ignore_list):
         "rules": [str(r) for r in rules],
         "ignore_list": sorted(ignore_list),
     }
+    if quality:
+        # Only non-default qualities change the key, so existing entries stay valid
+        cache_data["quality"] = quality
     cache_string = json.dumps(cache_data, sort_keys=True)
     return hashlib.md5(cache_string.encode("utf-8")).hexdigest()
 
@@ -236,8 +340,8 @@ async def get_locale(lang: str):
     if not file_path.exists():
         file_path = locale_dir / "en.json"
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        # Locale files only change with app updates: parse once, stat() after
+        return await asyncio.to_thread(load_json_cached, file_path)
     except Exception:
         return {}
 
@@ -249,17 +353,18 @@ async def synthesize(request: SynthesisRequest):
     if state_module.kokoro is None:
         raise HTTPException(status_code=503, detail="TTS Engine not initialized.")
 
-    try:
-        text = filter_text_for_tts(request.text)
-        rules_data = [r.model_dump() for r in request.rules]
-        text = apply_custom_pronunciations(text, rules_data, request.ignore_list)
-    except Exception:
-        text = filter_text_for_tts(request.text)
+    text = prepare_text(request)
+
+    # Nothing speakable: skip cache lookup, inference and WAV encoding
+    if not has_speakable(text):
+        return Response(content=SILENCE_WAV_100MS, media_type="audio/wav")
 
     try:
-        voices = state_module.kokoro.get_voices()
+        voices = system_status["voices_set"]
         selected_voice = request.voice if request.voice in voices else "af_sky"
         pause_settings = request.pause_settings or {}
+        fast = request.quality == "fast"
+        create = fast_create if fast else pooled_create
 
         cache_key = generate_cache_key(
             text,
@@ -268,9 +373,10 @@ async def synthesize(request: SynthesisRequest):
             pause_settings,
             request.rules,
             request.ignore_list,
+            quality="fast" if fast else None,
         )
 
-        cached_audio = audio_cache.get(cache_key)
+        cached_audio = await asyncio.to_thread(audio_cache.get, cache_key)
         if cached_audio:
             return StreamingResponse(
                 io.BytesIO(cached_audio),
@@ -298,30 +404,29 @@ async def synthesize(request: SynthesisRequest):
         has_punctuation = any(p in text for p in punctuation_chars)
         lang = get_language_from_voice(selected_voice)
 
-        if not re.search(
-            r"[a-zA-Z0-9\u3000-\u303f\u3040-\u309f\u30a0-\u30ff\uff00-\uff9f\u4e00-\u9faf\u3400-\u4dbf]",
-            text,
-        ):
-            samples = np.zeros(int(24000 * 0.1), dtype=np.float32)
-            sample_rate = 24000
+        # Inference runs in a worker thread (ORT releases the GIL), keeping
+        # the event loop free for other requests
+        if has_pause_settings and has_punctuation:
+            samples, sample_rate = await asyncio.to_thread(
+                synthesize_with_pauses,
+                text,
+                selected_voice,
+                float(request.speed or 1.0),
+                pause_settings,
+                create,
+            )
         else:
-            if has_pause_settings and has_punctuation:
-                samples, sample_rate = synthesize_with_pauses(
-                    text, selected_voice, float(request.speed or 1.0), pause_settings
-                )
-            else:
-                samples, sample_rate = state_module.kokoro.create(
-                    text,
-                    voice=selected_voice,
-                    speed=float(request.speed or 1.0),
-                    lang=lang,
-                )
+            samples, sample_rate = await asyncio.to_thread(
+                create,
+                text,
+                voice=selected_voice,
+                speed=float(request.speed or 1.0),
+                lang=lang,
+            )
 
-        buffer = io.BytesIO()
-        sf.write(buffer, samples.flatten(), sample_rate, format="WAV", subtype="PCM_16")
-        audio_bytes = buffer.getvalue()
+        audio_bytes = pcm16_wav(samples, sample_rate)
 
-        audio_cache.put(cache_key, audio_bytes)
+        await asyncio.to_thread(audio_cache.put, cache_key, audio_bytes)
 
         return StreamingResponse(
             io.BytesIO(audio_bytes),
@@ -330,3 +435,135 @@ async def synthesize(request: SynthesisRequest):
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/api/synthesize/stream")
+async def synthesize_stream(request: SynthesisRequest):
+    """
+    Streams WAV audio sentence by sentence, so playback can start as soon as
+    the first sentence is synthesized instead of after the whole text.
+    quality="fast" selects the int8 model. pause_settings sets the silence
+    between sentences (period/question/exclamation); pauses inside a sentence
+    are left to the model.
+    """
+    import app.state as state_module
+
+    engine = state_module.kokoro
+    if engine is None:
+        raise HTTPException(status_code=503, detail="TTS Engine not initialized.")
+
+    text = prepare_text(request)
+    voices = system_status["voices_set"]
+    selected_voice = request.voice if request.voice in voices else "af_sky"
+    speed = float(request.speed or 1.0)
+    lang = get_language_from_voice(selected_voice)
+    pause_settings = request.pause_settings or {}
+    fast = request.quality == "fast"
+    create = fast_create if fast else pooled_create
+    sentences = [
+        s
+        for s in map(str.strip, _SENTENCE_SPLIT_RE.split(text))
+        if has_speakable(s)
+    ]
+
+    # Nothing speakable: the prebuilt silence clip, without starting a stream
+    if not sentences:
+        return Response(content=SILENCE_WAV_100MS, media_type="audio/wav")
+
+    # Stitched per-sentence audio differs from a whole-text /api/synthesize
+    # result, so the stream has a key of its own; a replay is still served from
+    # the cache as one complete WAV without touching the engine
+    cache_key = generate_cache_key(
+        text,
+        selected_voice,
+        speed,
+        pause_settings,
+        request.rules,
+        request.ignore_list,
+        quality="stream-fast" if fast else "stream",
+    )
+    cached_audio = await asyncio.to_thread(audio_cache.get, cache_key)
+    if cached_audio:
+        return Response(content=cached_audio, media_type="audio/wav")
+
+    async def first_sentence_chunks(sentence: str):
+        # create_stream yields per phoneme batch, so time-to-first-byte is one
+        # batch even when the opening sentence is long
+        if hasattr(engine, "create_stream") and not fast:
+            streamed = False
+            try:
+                async for samples, _ in engine.create_stream(
+                    sentence, voice=selected_voice, speed=speed, lang=lang
+                ):
+                    streamed = True
+                    yield to_pcm16(samples).tobytes()
+                return
+            except Exception as e:
+                if streamed:
+                    print(f"[STREAM] First sentence interrupted: {e}")
+                    return
+        samples, _ = await asyncio.to_thread(
+            create, sentence, voice=selected_voice, speed=speed, lang=lang
+        )
+        yield to_pcm16(samples).tobytes()
+
+    def pause_after(sentence: str) -> bytes:
+        # Sentences are split after their terminator, so it is the last character
+        ms = pause_settings.get(_PAUSE_CHAR_MAP.get(sentence[-1]), 0) or 0
+        return bytes(2 * max(int(ms / 1000.0 * SAMPLE_RATE), 0))
+
+    async def audio_stream():
+        yield wav_header(SAMPLE_RATE)
+        # Keep a bounded window of upcoming sentences in flight on the shared
+        # pool while earlier ones are sent; a client that disconnects early
+        # leaves at most STREAM_PREFETCH sentences of wasted work
+        loop = asyncio.get_running_loop()
+        upcoming = iter(sentences[1:])
+        pending = collections.deque()
+
+        def submit_next():
+            sentence = next(upcoming, None)
+            if sentence is not None:
+                pending.append(
+                    loop.run_in_executor(
+                        _synth_executor,
+                        functools.partial(
+                            create,
+                            sentence,
+                            voice=selected_voice,
+                            speed=speed,
+                            lang=lang,
+                        ),
+                    )
+                )
+
+        for _ in range(STREAM_PREFETCH):
+            submit_next()
+        pcm_chunks = []
+        try:
+            async for chunk in first_sentence_chunks(sentences[0]):
+                pcm_chunks.append(chunk)
+                yield chunk
+            for previous in sentences[:-1]:
+                samples, _ = await pending.popleft()
+                submit_next()
+                gap = pause_after(previous)
+                if gap:
+                    pcm_chunks.append(gap)
+                    yield gap
+                chunk = to_pcm16(samples).tobytes()
+                pcm_chunks.append(chunk)
+                yield chunk
+        finally:
+            for future in pending:
+                future.cancel()
+
+        # Only reached when the whole text was sent: cache the complete WAV
+        pcm = b"".join(pcm_chunks)
+        audio_bytes = wav_header(SAMPLE_RATE, len(pcm)) + pcm
+        try:
+            await asyncio.to_thread(audio_cache.put, cache_key, audio_bytes)
+        except Exception as e:
+            print(f"[STREAM] Failed to cache audio: {e}")
+
+    return StreamingResponse(audio_stream(), media_type="audio/wav")
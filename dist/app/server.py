@@ -1,9 +1,12 @@
 from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+import asyncio
+import gzip
+import mimetypes
 import time
-import json
 import psutil
 
 # Import Refactored Modules
@@ -14,7 +17,7 @@ from .config import (
     settings_file,
     library_file,
 )
-from .utils import safe_save_json, safe_init_json
+from .utils import safe_save_json, safe_init_json, etag_matches
 import app.state as state_module
 from .routers import settings, library, tts, system, export, timer
 from .utils import safe_init_json
@@ -72,12 +75,16 @@ async def lifespan(app: FastAPI):
     yield
 
     # Shutdown logic
+    await library.flush_library()  # Persist any edits still inside the debounce window
     state_module.sleep_timer.stop_timer()
+    library.shutdown_epub_pool()
+    state_module.audio_cache.close()  # Writes buffered LRU access times
     print("[SHUTDOWN] Cleanup complete.")
 
 
 # --- App Definition ---
-app = FastAPI(lifespan=lifespan)
+# orjson for all JSON responses (library/content payloads can be large)
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 # --- Middleware ---
 app.add_middleware(
@@ -97,8 +104,72 @@ app.include_router(export.router)
 app.include_router(timer.router)
 
 # --- Static Files ---
-# Mount static assets
 ui_dir = base_dir / "ui"
+lib_dir = ui_dir / "lib"
+
+# Vendored JS libraries (pdf.js, lucide): large, rarely changing files.
+# Kept in memory with a gzip copy; name -> ((mtime_ns, size), raw, gzipped)
+_lib_cache = {}
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    """Accept-Encoding allows gzip: listed (or covered by "*") with a non-zero q."""
+    wildcard = False
+    for item in accept_encoding.lower().split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip()
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding in ("gzip", "x-gzip"):
+            return q > 0
+        if coding == "*":
+            wildcard = q > 0
+    return wildcard
+
+
+def _load_lib_file(file_path):
+    raw = file_path.read_bytes()
+    return raw, gzip.compress(raw, compresslevel=9)
+
+
+@app.get("/lib/{path:path}")
+async def serve_lib(path: str, request: Request):
+    file_path = (lib_dir / path).resolve()
+    if lib_dir.resolve() not in file_path.parents or not file_path.is_file():
+        return Response(status_code=404)
+
+    st = file_path.stat()
+    sig = (st.st_mtime_ns, st.st_size)
+    cached = _lib_cache.get(path)
+    if cached is None or cached[0] != sig:
+        raw, gzipped = await asyncio.to_thread(_load_lib_file, file_path)
+        cached = _lib_cache[path] = (sig, raw, gzipped)
+
+    # Gzip and identity bodies differ byte-for-byte: each gets its own strong ETag
+    use_gzip = _accepts_gzip(request.headers.get("accept-encoding", ""))
+    etag = f'"{sig[0]:x}-{sig[1]:x}{"-gz" if use_gzip else ""}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "public, max-age=86400",
+        "Vary": "Accept-Encoding",
+    }
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    media_type = mimetypes.guess_type(file_path.name)[0] or "application/octet-stream"
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=cached[2], media_type=media_type, headers=headers)
+    return Response(content=cached[1], media_type=media_type, headers=headers)
+
+
+# Mount static assets
 if ui_dir.exists():
     app.mount("/css", StaticFiles(directory=ui_dir / "css"), name="css")
     app.mount("/js", StaticFiles(directory=ui_dir / "js"), name="js")
@@ -1,11 +1,14 @@
+import functools
+import queue
 import threading
 import time
 import os
 import numpy as np
 import sys
+from contextlib import contextmanager
 from typing import Optional, Dict
 from kokoro_onnx import Kokoro, MAX_PHONEME_LENGTH, SAMPLE_RATE
-from .config import cache_db_path, MAX_CACHE_SIZE_MB, base_dir
+from .config import cache_db_path, audio_cache_dir, MAX_CACHE_SIZE_MB, base_dir
 
 # Import AudioCache
 try:
@@ -15,10 +18,31 @@ except ImportError:
     from audio_cache import AudioCache
 
 # --- Global State Instances ---
-audio_cache = AudioCache(cache_db_path, max_size_mb=MAX_CACHE_SIZE_MB)
+audio_cache = AudioCache(
+    cache_db_path, max_size_mb=MAX_CACHE_SIZE_MB, audio_dir=audio_cache_dir
+)
 kokoro = None  # The TTS engine instance
 
-system_status = {"is_loading": False, "last_error": None, "is_downloading": False}
+# Optional pool of independent engines (LOCALREADER_ENGINE_POOL=N, default 1).
+# Each pooled engine holds its own copy of the model and a 1/N share of the
+# cores; with the default, requests share `kokoro` directly (ORT sessions are
+# safe to run concurrently).
+ENGINE_POOL_SIZE = max(1, int(os.environ.get("LOCALREADER_ENGINE_POOL", "1") or 1))
+engine_pool: Optional[queue.Queue] = None
+
+# Int8 engine for quality="fast" requests, loaded on first use (reset on reload)
+FAST_MODEL_PATH = base_dir / "models" / "kokoro.int8.onnx"
+fast_engine = None
+_fast_engine_lock = threading.Lock()
+
+system_status = {
+    "is_loading": False,
+    "last_error": None,
+    "is_downloading": False,
+    "provider": None,
+    "voices": [],  # Cached engine.get_voices() for the loaded model
+    "voices_set": frozenset(),  # Same, for O(1) membership checks
+}
 
 export_status = {
     "is_exporting": False,
@@ -38,6 +62,190 @@ ffmpeg_status = {
 }
 
 
+# --- Execution Providers ---
+# Preferred accelerators, best first. CPU is always appended as the last resort.
+PREFERRED_PROVIDERS = [
+    # Grow the GPU arena only by what each request needs (variable-length inputs)
+    (
+        "CUDAExecutionProvider",
+        {"device_id": 0, "arena_extend_strategy": "kSameAsRequested"},
+    ),
+    ("CoreMLExecutionProvider", {"ModelFormat": "MLProgram", "MLComputeUnits": "ALL"}),
+    ("DmlExecutionProvider", {}),
+]
+
+
+def select_providers(allow_accelerators: bool = True):
+    """Return the ORT provider list for this machine (accelerators first, then CPU)."""
+    import onnxruntime as ort
+
+    available = set(ort.get_available_providers())
+    providers = []
+    if allow_accelerators:
+        providers = [
+            (name, opts) for name, opts in PREFERRED_PROVIDERS if name in available
+        ]
+    providers.append(("CPUExecutionProvider", {}))
+    return providers
+
+
+def make_session_options(intra_op_threads: Optional[int] = None):
+    """Session options tuned for low-latency CPU inference."""
+    import onnxruntime as ort
+    import psutil
+
+    so = ort.SessionOptions()
+    so.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    so.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+    # Physical cores: hyperthreads add contention, not throughput, for GEMM-heavy graphs
+    cores = psutil.cpu_count(logical=False) or os.cpu_count() or 1
+    so.intra_op_num_threads = intra_op_threads or cores
+    so.inter_op_num_threads = 1
+    so.enable_mem_pattern = True
+    so.enable_cpu_mem_arena = True
+    return so
+
+
+def create_engine(
+    engine_cls,
+    model_path: str,
+    voices_path: str,
+    allow_accelerators: bool = True,
+    intra_op_threads: Optional[int] = None,
+):
+    """
+    Build a Kokoro engine on the best available execution provider.
+    Older kokoro_onnx versions without from_session get their default session
+    swapped for the tuned one; if the session can't be built at all, the
+    library's defaults are used.
+    """
+    import onnxruntime as ort
+
+    try:
+        session = ort.InferenceSession(
+            model_path,
+            sess_options=make_session_options(intra_op_threads),
+            providers=select_providers(allow_accelerators),
+        )
+    except Exception as e:
+        print(f"[ENGINE] Provider selection failed, using defaults: {e}")
+        session = None
+
+    if session is not None and hasattr(engine_cls, "from_session"):
+        engine = engine_cls.from_session(session, voices_path)
+    else:
+        engine = engine_cls(model_path, voices_path)
+        if session is not None:
+            engine.sess = session
+
+    sess = getattr(engine, "sess", None)
+    system_status["provider"] = sess.get_providers()[0] if sess else None
+    return engine
+
+
+def pool_intra_op_threads() -> Optional[int]:
+    """Per-session ORT thread count when pooling (None: use all cores)."""
+    if ENGINE_POOL_SIZE <= 1:
+        return None
+    import psutil
+
+    cores = psutil.cpu_count(logical=False) or os.cpu_count() or 1
+    return max(1, cores // ENGINE_POOL_SIZE)
+
+
+def build_engine_pool(engine_cls, model_path: str, voices_path: str, **kwargs):
+    """Fill engine_pool with ENGINE_POOL_SIZE engines, starting with `kokoro`."""
+    global engine_pool
+    engine_pool = None
+    if ENGINE_POOL_SIZE <= 1 or kokoro is None:
+        return
+
+    threads = pool_intra_op_threads()
+    pool = queue.Queue()
+    pool.put(kokoro)
+    for _ in range(ENGINE_POOL_SIZE - 1):
+        pool.put(
+            create_engine(
+                engine_cls, model_path, voices_path, intra_op_threads=threads, **kwargs
+            )
+        )
+    engine_pool = pool
+    print(f"[ENGINE] Engine pool: {ENGINE_POOL_SIZE} sessions x {threads} threads")
+
+
+def warm_up_engines(voice: str, lang: str = "en-us"):
+    """
+    Run one short synthesis on every loaded engine so ORT's first-run costs
+    (arena growth, kernel selection, provider graph compilation) are paid at
+    load time instead of by the first user request.
+    """
+    engines = list(engine_pool.queue) if engine_pool is not None else [kokoro]
+    for engine in engines:
+        if engine is None:
+            continue
+        try:
+            engine.create("Hello.", voice=voice, speed=1.0, lang=lang)
+        except Exception as e:
+            print(f"[ENGINE] Warm-up failed: {e}")
+            return
+
+
+@contextmanager
+def acquire_engine():
+    """Check out an engine for one synthesis call (blocking; use from worker threads)."""
+    pool = engine_pool
+    if pool is None:
+        yield kokoro
+        return
+    engine = pool.get()
+    try:
+        yield engine
+    finally:
+        pool.put(engine)
+
+
+def pooled_create(text: str, **kwargs):
+    """engine.create() on an engine checked out from the pool."""
+    with acquire_engine() as engine:
+        return engine.create(text, **kwargs)
+
+
+def get_fast_engine():
+    """
+    Int8 engine for low-latency requests: the loaded engine when it already is
+    the quantized model, otherwise a CPU session loaded on first use. None when
+    the quantized model hasn't been downloaded.
+    """
+    global fast_engine
+    if fast_engine is not None or kokoro is None:
+        return fast_engine
+    with _fast_engine_lock:
+        if fast_engine is None and FAST_MODEL_PATH.exists():
+            provider = system_status["provider"]
+            try:
+                fast_engine = create_engine(
+                    Kokoro,
+                    str(FAST_MODEL_PATH),
+                    str(base_dir / "models" / "voices.bin"),
+                    allow_accelerators=False,
+                )
+                print("[ENGINE] Loaded int8 model for fast synthesis")
+            except Exception as e:
+                print(f"[ENGINE] Failed to load int8 model: {e}")
+            finally:
+                # The main engine's provider is what the status reports
+                system_status["provider"] = provider
+    return fast_engine
+
+
+def fast_create(text: str, **kwargs):
+    """engine.create() on the int8 engine, falling back to the main engine(s)."""
+    engine = get_fast_engine()
+    if engine is None:
+        return pooled_create(text, **kwargs)
+    return engine.create(text, **kwargs)
+
+
 # --- PatchedKokoro Class ---
 class PatchedKokoro(Kokoro):
     """
@@ -45,23 +253,54 @@ class PatchedKokoro(Kokoro):
     """
 
     def get_voices(self):
-        # Explicit delegation to ensure it works
-        voices = super().get_voices()
+        # Explicit delegation to ensure it works; the voice pack is fixed for the
+        # lifetime of the instance, so it is listed once (set lazily, since
+        # from_session may bypass __init__)
+        voices = self.__dict__.get("_voice_list")
+        if voices is None:
+            voices = self._voice_list = list(super().get_voices())
+            self._voice_names = frozenset(voices)
         return voices
 
+    @property
+    def voice_names(self) -> frozenset:
+        """Voice ids as a frozenset, for O(1) membership tests."""
+        self.get_voices()
+        return self._voice_names
+
+    def _build_input_ids(self, phonemes: str) -> np.ndarray:
+        tokens = np.asarray(self.tokenizer.tokenize(phonemes), dtype=np.int64)
+        # Pad with the boundary token (0) on both ends, built directly as int64
+        input_ids = np.zeros((1, tokens.size + 2), dtype=np.int64)
+        input_ids[0, 1:-1] = tokens
+        input_ids.setflags(write=False)  # Shared between calls via the cache
+        return input_ids
+
+    def _input_ids(self, phonemes: str) -> np.ndarray:
+        # Per-instance cache, so it goes away with the engine on model reload.
+        # Replays and speed changes of the same sentence skip tokenization.
+        cache = self.__dict__.get("_input_ids_cache")
+        if cache is None:
+            cache = functools.lru_cache(maxsize=256)(self._build_input_ids)
+            self._input_ids_cache = cache
+        return cache(phonemes)
+
     def _create_audio(self, phonemes: str, voice: np.ndarray, speed: float):
         phonemes = phonemes[:MAX_PHONEME_LENGTH]
-        tokens = np.array(self.tokenizer.tokenize(phonemes), dtype=np.int64)
+        input_ids = self._input_ids(phonemes)
+        n_tokens = input_ids.shape[1] - 2
 
-        if len(tokens) == 0:
+        if n_tokens == 0:
             print(f"[PatchedKokoro] Warning: No tokens for phonemes '{phonemes}'")
             return np.zeros(int(SAMPLE_RATE * 0.1), dtype=np.float32), SAMPLE_RATE
 
-        style_idx = min(len(tokens), len(voice) - 1)
+        # input_ids is deliberately not padded to fixed-length buckets: Kokoro's
+        # duration predictor voices every token, so padding adds audio that
+        # can't be trimmed reliably, and the output length varies per call anyway
+        style_idx = min(n_tokens, len(voice) - 1)
         voice_style = voice[style_idx]
-        tokens = [[0, *tokens, 0]]
         inputs = {
-            "input_ids": tokens,
+            "input_ids": input_ids,
             "style": np.array(voice_style, dtype=np.float32),
             "speed": np.array([speed], dtype=np.float32),
         }
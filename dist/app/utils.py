@@ -1,21 +1,75 @@
-import json
+import os
+import orjson
 from pathlib import Path
-from typing import Any
+from typing import Any, Dict, Optional, Tuple
+
+# path -> ((mtime_ns, size), parsed data) for small, frequently read files
+_json_cache: Dict[Path, Tuple[Tuple[int, int], Any]] = {}
+
+
+def load_json(path: Path) -> Any:
+    """Read and parse a JSON file (orjson, binary mode)"""
+    return orjson.loads(path.read_bytes())
+
+
+def load_json_cached(path: Path) -> Any:
+    """
+    load_json with an in-memory mirror, revalidated by a stat() call.
+    Files written through safe_save_json refresh the mirror directly; external
+    edits are picked up when the file's mtime or size changes.
+    """
+    st = path.stat()
+    sig = (st.st_mtime_ns, st.st_size)
+    cached = _json_cache.get(path)
+    if cached is not None and cached[0] == sig:
+        return cached[1]
+    data = load_json(path)
+    _json_cache[path] = (sig, data)
+    return data
 
 
 def safe_save_json(path: Path, data: Any):
-    """Atomic write to prevent corruption"""
+    """Atomic, durable write: fsync the temp file before renaming it over the target"""
+    cached = _json_cache.pop(path, None)
+    buf = memoryview(orjson.dumps(data))
     temp_path = path.with_suffix(".tmp")
-    with open(temp_path, "w") as f:
-        json.dump(data, f)
-    temp_path.replace(path)
+    # Unbuffered fd: the payload goes out in one write() (looped only if short)
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+    fd = os.open(temp_path, flags, 0o644)
+    try:
+        while buf:
+            buf = buf[os.write(fd, buf) :]
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    os.replace(temp_path, path)
+    if cached is not None:
+        st = path.stat()
+        _json_cache[path] = ((st.st_mtime_ns, st.st_size), data)
 
 
 def safe_init_json(path: Path, default_data: Any):
     """Initialize JSON file if it doesn't exist"""
     if not path.exists():
-        with open(path, "w") as f:
-            json.dump(default_data, f)
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(default_data))
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    If-None-Match check (RFC 9110 weak comparison): the header may list several
+    tags or be "*", and W/"x" matches "x".
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if (tag[2:] if tag.startswith("W/") else tag) == opaque:
+            return True
+    return False
 
 
 def get_language_from_voice(voice: str) -> str:
@@ -13,7 +13,7 @@ base_dir = Path(__file__).parent.absolute()
 sys.path.insert(0, str(base_dir))
 
 # --- 2. LOCAL FFMPEG SETUP ---
-# Point system PATH to our local /bin folder so pydub finds ffmpeg.exe
+# Point system PATH to our local /bin folder so ffmpeg.exe is found
 bin_path = base_dir / "bin"
 
 if bin_path.exists():
@@ -25,8 +25,9 @@ else:
     print(f"          FFMPEG will need to be downloaded on first export.")
 
 # --- 3. IMPORT APP ---
-# Now when pydub loads, it will find our local ffmpeg first
-from app.server import app
+# Done under the __main__ guard below: EPUB conversion runs in spawned worker
+# processes, which re-run this file as __mp_main__ and must not load the server
+app = None
 
 def is_port_in_use(port):
     """Check if a port is already in use"""
@@ -111,4 +112,5 @@ def main():
     os._exit(0)
 
 if __name__ == "__main__":
+    from app.server import app
     main()
@@ -0,0 +1,41 @@
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "dist" / "app"))
+
+from logic.text_normalizer import apply_pronunciation_key  # noqa: E402
+
+
+class MixedRegexRulesTest(unittest.TestCase):
+    """Regex rules with inline flags or backreferences next to plain rules."""
+
+    RULES = (
+        # (original, replacement, match_case, word_boundary, is_regex)
+        ("Dr.", "Doctor", True, False, False),
+        ("(?i)nasa", "N.A.S.A.", True, True, True),
+        (r"(\w+) \1\b", r"\1", True, False, True),
+        ("colou?r", "color", False, True, True),
+        ("etc", "et cetera", False, True, False),
+    )
+
+    def test_all_rules_apply(self):
+        text = "Dr. Smith of NaSa saw the the Colour red etc."
+        self.assertEqual(
+            apply_pronunciation_key(text, self.RULES),
+            "Doctor Smith of N.A.S.A. saw the color red et cetera.",
+        )
+
+    def test_ignore_list_survives_flagged_rules(self):
+        self.assertEqual(
+            apply_pronunciation_key("Dr. Who [1]", self.RULES, ("[1]",)),
+            "Doctor Who ",
+        )
+
+    def test_invalid_rule_drops_only_itself(self):
+        rules = self.RULES + (("(", "x", True, False, True),)
+        self.assertEqual(apply_pronunciation_key("Dr. Who", rules), "Doctor Who")
+
+
+if __name__ == "__main__":
+    unittest.main()